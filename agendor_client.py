@@ -3,66 +3,382 @@ Cliente para API do Agendor CRM
 """
 
 import requests
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 from datetime import datetime, timedelta
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import random
+import threading
 import time
-from config import API_BASE_URL, HEADERS
+from config import (
+    API_BASE_URL, HEADERS, PAGE_SIZE, MAX_CONCURRENT_PAGES,
+    REQUEST_TIMEOUT, MAX_RETRIES, MAX_BACKOFF,
+    LOCAL_STORE_PATH, LOCAL_STORE_MAX_AGE, FULL_SYNC_INTERVAL
+)
+from deal_sync import DealSnapshot
+from deal_store import DealStore
+
+
+# ids de dealStatus retornados pela API
+DEAL_STATUS_IDS = {'ongoing': 1, 'won': 2, 'lost': 3}
+
+# respostas que valem nova tentativa (rate limit e falhas temporárias)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class AgendorAPIError(Exception):
+    """A API continuou falhando depois de todas as tentativas"""
+
+
+def parse_retry_after(headers) -> Optional[float]:
+    """Segundos de espera pedidos pela API (Retry-After ou X-RateLimit-Reset)"""
+    for header in ('Retry-After', 'X-RateLimit-Reset'):
+        value = headers.get(header)
+        if value is None:
+            continue
+        try:
+            seconds = float(value)
+        except ValueError:
+            continue
+        # alguns servidores mandam o reset como timestamp absoluto
+        if seconds > 1e9:
+            seconds -= time.time()
+        return max(0.0, seconds)
+    return None
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Backoff exponencial com jitter; respeita o Retry-After quando existe"""
+    if retry_after is not None:
+        return min(retry_after, MAX_BACKOFF)
+    return random.uniform(0.5, 1.0) * min(MAX_BACKOFF, 0.5 * 2 ** attempt)
+
+
+class RequestThrottle:
+    """
+    Ritmo adaptativo das requisições, compartilhado entre threads
+
+    Começa sem intervalo entre requisições; cada 429 dobra o intervalo (e
+    pausa todas as requisições pelo Retry-After), cada sucesso o reduz aos
+    poucos. Quando a API informa poucas requisições restantes, o intervalo
+    é esticado para distribuí-las até o reset.
+    """
+    
+    def __init__(self, min_interval: float = 0.0, max_interval: float = 5.0):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self._next_slot = 0.0
+        self._last_throttled = 0.0
+        self._lock = threading.Lock()
+    
+    def reserve(self) -> float:
+        """Reserva o próximo horário de envio e retorna quanto esperar"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+            return slot - now
+    
+    def on_success(self, headers) -> None:
+        with self._lock:
+            self.interval = max(self.min_interval, self.interval * 0.9 - 0.01)
+            
+            try:
+                remaining = int(headers.get('X-RateLimit-Remaining'))
+            except (TypeError, ValueError):
+                return
+            reset = parse_retry_after(headers)
+            if reset and remaining < 10:
+                spread = reset / max(remaining, 1)
+                self.interval = min(self.max_interval, max(self.interval, spread))
+    
+    def on_throttled(self, retry_after: Optional[float]) -> None:
+        with self._lock:
+            now = time.monotonic()
+            # várias requisições em voo recebem 429 juntas: conta como um só
+            if now - self._last_throttled >= self.interval:
+                self.interval = min(self.max_interval, max(self.interval * 2, 0.1))
+                self._last_throttled = now
+            if retry_after:
+                self._next_slot = max(self._next_slot, now + retry_after)
 
 
 class AgendorClient:
     
-    def __init__(self):
+    def __init__(self, max_concurrency: int = MAX_CONCURRENT_PAGES, use_store: bool = True,
+                 max_age: float = LOCAL_STORE_MAX_AGE, full_sync_interval: float = FULL_SYNC_INTERVAL):
         self.base_url = API_BASE_URL
         self.headers = HEADERS
+        self.max_concurrency = max(1, max_concurrency)
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        
+        # pool de conexões do tamanho do número de páginas em paralelo
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=max(10, self.max_concurrency))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # snapshot local usado pela sincronização incremental
+        self.deal_snapshot = DealSnapshot()
+        
+        # armazenamento em disco compartilhado com outros processos
+        self.store = DealStore(LOCAL_STORE_PATH) if use_store and LOCAL_STORE_PATH else None
+        self.max_age = max_age
+        self.full_sync_interval = full_sync_interval
+        self._snapshot_loaded = self.store is None
+        self._snapshot_lock = threading.Lock()
+        
+        self.throttle = RequestThrottle()
     
     def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
         url = f"{self.base_url}/{endpoint}"
+        error = None
         
-        try:
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Erro na requisição: {e}")
-            return {"data": []}
+        for attempt in range(MAX_RETRIES + 1):
+            wait = self.throttle.reserve()
+            if wait > 0:
+                time.sleep(wait)
+            
+            retry_after = None
+            try:
+                response = self.session.get(url, params=params, timeout=REQUEST_TIMEOUT)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.ChunkedEncodingError) as e:
+                # falhas de rede (inclusive conexão caída no meio da resposta)
+                error = e
+            except requests.exceptions.RequestException as e:
+                # demais erros do requests (redirects, decodificação...): um só
+                # tipo de erro para quem chama
+                raise AgendorAPIError(f"Falha em {endpoint}: {e}") from e
+            else:
+                if response.status_code in RETRY_STATUS_CODES:
+                    error = f"HTTP {response.status_code}"
+                    retry_after = parse_retry_after(response.headers)
+                    if response.status_code == 429:
+                        self.throttle.on_throttled(retry_after)
+                else:
+                    self.throttle.on_success(response.headers)
+                    try:
+                        response.raise_for_status()
+                        return response.json()
+                    except (requests.exceptions.RequestException, ValueError) as e:
+                        # erros definitivos (4xx) não melhoram com nova tentativa
+                        print(f"Erro na requisição: {e}")
+                        return {"data": []}
+            
+            if attempt < MAX_RETRIES:
+                time.sleep(backoff_delay(attempt, retry_after))
+        
+        # falhar alto: devolver lista vazia truncaria a paginação em silêncio
+        raise AgendorAPIError(f"Falha em {endpoint} após {MAX_RETRIES + 1} tentativas: {error}")
     
-    def _get_all_pages(self, endpoint: str, params: Optional[Dict] = None) -> List[Dict]:
-        # busca todos os registros paginados
-        all_data = []
-        page = 1
+    def _fetch_page(self, endpoint: str, params: Dict, page: int) -> List[Dict]:
+        page_params = dict(params, page=page, per_page=PAGE_SIZE)
+        response = self._make_request(endpoint, page_params)
+        
+        if not response or 'data' not in response:
+            return []
+        
+        return response['data'] or []
+    
+    def iter_pages(self, endpoint: str, params: Optional[Dict] = None) -> Iterator[List[Dict]]:
+        """
+        Gera as páginas de um endpoint à medida que chegam, em ordem
+
+        Permite processar os registros sem montar a lista completa na memória.
+        """
         params = params or {}
         
+        if self.max_concurrency > 1:
+            yield from self._iter_pages_concurrent(endpoint, params)
+            return
+        
+        page = 1
+        
         while True:
-            params['page'] = page
-            params['per_page'] = 100
-            
-            response = self._make_request(endpoint, params)
-            
-            if not response or 'data' not in response:
-                break
-            
-            data = response['data']
+            data = self._fetch_page(endpoint, params, page)
             if not data:
                 break
             
-            all_data.extend(data)
+            yield data
             
-            if len(data) < 100:
+            if len(data) < PAGE_SIZE:
                 break
             
             page += 1
-            time.sleep(0.1)  # evita rate limiting
+    
+    def _iter_pages_concurrent(self, endpoint: str, params: Dict) -> Iterator[List[Dict]]:
+        # a página 1 vai sozinha: a maioria das consultas (ex.: sincronização
+        # incremental) cabe nela, e páginas vazias em paralelo só gastariam
+        # o rate limit. Cheia, mantém até max_concurrency páginas em voo e
+        # entrega os resultados na ordem; para na primeira página incompleta
+        data = self._fetch_page(endpoint, params, 1)
+        if data:
+            yield data
+        if len(data) < PAGE_SIZE:
+            return
+        
+        next_page = 2
+        pending = deque()
         
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            try:
+                for _ in range(self.max_concurrency):
+                    pending.append(executor.submit(self._fetch_page, endpoint, params, next_page))
+                    next_page += 1
+                
+                while pending:
+                    data = pending.popleft().result()
+                    if data:
+                        yield data
+                    
+                    if len(data) < PAGE_SIZE:
+                        break
+                    
+                    pending.append(executor.submit(self._fetch_page, endpoint, params, next_page))
+                    next_page += 1
+            finally:
+                # páginas além do fim (ou de um consumidor que parou) não são mais buscadas
+                for future in pending:
+                    future.cancel()
+    
+    def _get_all_pages(self, endpoint: str, params: Optional[Dict] = None) -> List[Dict]:
+        # busca todos os registros paginados
+        all_data = []
+        for page in self.iter_pages(endpoint, params):
+            all_data.extend(page)
         return all_data
     
-    def get_deals(self, status: Optional[str] = None) -> List[Dict]:
+    def iter_deal_pages(self, status: Optional[str] = None) -> Iterator[List[Dict]]:
+        # páginas de negócios direto da API (ver iter_pages)
         params = {}
         if status:
             params['status'] = status
         
-        return self._get_all_pages('deals', params)
+        return self.iter_pages('deals', params)
+    
+    def fetch_deals(self, status: Optional[str] = None) -> List[Dict]:
+        # download completo direto da API, sem passar pelo armazenamento local
+        return [deal for page in self.iter_deal_pages(status) for deal in page]
+    
+    def get_deals(self, status: Optional[str] = None) -> List[Dict]:
+        if self.store is None:
+            return self.fetch_deals(status)
+        
+        # lê do disco enquanto estiver dentro da validade, senão sincroniza
+        self.load_snapshot()
+        if len(self.deal_snapshot) and self.store.is_fresh('deals', self.max_age):
+            deals = self.deal_snapshot.deals
+        else:
+            deals = self.sync_deals()
+        
+        if status:
+            status_id = DEAL_STATUS_IDS.get(status)
+            deals = [
+                deal for deal in deals
+                if isinstance(deal.get('dealStatus'), dict) and deal['dealStatus'].get('id') == status_id
+            ]
+        
+        return deals
+    
+    def get_deal(self, deal_id: int) -> Optional[Dict]:
+        """Um negócio pelo id (ver find_deals)"""
+        return self.find_deals([deal_id]).get(deal_id)
+    
+    def find_deals(self, deal_ids: Iterable[int]) -> Dict[int, Dict]:
+        """
+        Negócios pelos ids, sem baixar a conta inteira
+        
+        Procura no snapshot em memória, depois no armazenamento local (pela
+        chave primária) e só busca na API (GET /deals/{id}, em paralelo) os
+        que faltarem. Como em get_deals, as cópias locais só valem dentro de
+        max_age: vencidas, todos os ids vêm da API. Ids inexistentes ficam
+        fora do resultado.
+        """
+        deal_ids = [int(deal_id) for deal_id in dict.fromkeys(deal_ids)]
+        found = {}
+        local = self.store is None or self.store.is_fresh('deals', self.max_age)
+        
+        if local:
+            for deal_id in deal_ids:
+                deal = self.deal_snapshot.get(deal_id)
+                if deal is not None:
+                    found[deal_id] = deal
+        
+        missing = [deal_id for deal_id in deal_ids if deal_id not in found]
+        if missing and local and self.store is not None and not self._snapshot_loaded:
+            found.update(self.store.get_many('deals', missing))
+            missing = [deal_id for deal_id in missing if deal_id not in found]
+        
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(missing))) as executor:
+                for deal_id, deal in zip(missing, executor.map(self._fetch_deal, missing)):
+                    if deal is not None:
+                        found[deal_id] = deal
+        
+        return found
+    
+    def _fetch_deal(self, deal_id: int) -> Optional[Dict]:
+        response = self._make_request(f'deals/{deal_id}')
+        data = response.get('data') if response else None
+        return data if isinstance(data, dict) else None
+    
+    def get_deals_updated_since(self, since: str) -> List[Dict]:
+        # negócios alterados depois de `since` (ISO 8601)
+        return self._get_all_pages('deals', {'updatedDateGt': since})
+    
+    def load_snapshot(self):
+        # carrega o snapshot salvo em disco uma única vez por cliente
+        with self._snapshot_lock:
+            if not self._snapshot_loaded:
+                self.deal_snapshot = self.store.load_snapshot()
+                self._snapshot_loaded = True
+    
+    def deals_since(self) -> Optional[str]:
+        # updatedDateGt da próxima sincronização; None quando é a vez do
+        # download completo (snapshot vazio ou último completo vencido),
+        # o único que remove negócios excluídos no Agendor
+        if self.deal_snapshot.full_sync_due(self.full_sync_interval):
+            return None
+        return self.deal_snapshot.next_since()
+    
+    def sync_deals(self, full: bool = False) -> List[Dict]:
+        # atualiza o snapshot local só com o que mudou e devolve a lista completa
+        self.load_snapshot()
+        full_download = full or self.deals_since() is None
+        received = self.deal_snapshot.sync(self, full=full_download)
+        self._persist_deals(received, full_download)
+        return self.deal_snapshot.deals
+    
+    def apply_deals(self, deals: List[Dict], full: bool) -> List[Dict]:
+        # aplica negócios buscados por fora (ex.: cliente assíncrono)
+        self.load_snapshot()
+        received = self.deal_snapshot.apply(deals, full=full)
+        self._persist_deals(received, full)
+        return self.deal_snapshot.deals
+    
+    def _persist_deals(self, received: List[Dict], replace: bool):
+        if self.store is None:
+            return
+        
+        if received:
+            # em páginas: o JSON serializado da conta inteira nunca fica
+            # montado de uma vez (a marca d'água sai da própria gravação)
+            pages = (received[start:start + PAGE_SIZE] for start in range(0, len(received), PAGE_SIZE))
+            self.store.save_pages('deals', pages, replace=replace)
+        else:
+            self.store.touch('deals')
+    
+    def _get_cached_collection(self, collection: str, fetch) -> List[Dict]:
+        # coleções pequenas (usuários, funis): regravadas inteiras quando vencem
+        if self.store is not None and self.store.is_fresh(collection, self.max_age):
+            return self.store.load(collection)
+        
+        data = fetch()
+        if self.store is not None and data:
+            self.store.save(collection, data)
+        return data
     
     def get_deals_won(self) -> List[Dict]:
         return self.get_deals(status='won')
@@ -80,15 +396,17 @@ class AgendorClient:
         return self._get_all_pages('organizations')
     
     def get_funnels(self) -> List[Dict]:
-        response = self._make_request('funnels')
-        return response.get('data', [])
+        return self._get_cached_collection(
+            'funnels', lambda: self._make_request('funnels').get('data', [])
+        )
     
     def get_products(self) -> List[Dict]:
         return self._get_all_pages('products')
     
     def get_users(self) -> List[Dict]:
-        response = self._make_request('users')
-        return response.get('data', [])
+        return self._get_cached_collection(
+            'users', lambda: self._make_request('users').get('data', [])
+        )
     
     def get_tasks(self, status: Optional[str] = None) -> List[Dict]:
         params = {}
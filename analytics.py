@@ -4,66 +4,210 @@ Análises e transformações de dados do Agendor
 
 import pandas as pd
 import numpy as np
+import functools
+import inspect
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from collections import defaultdict
+from segments import classify_segments
+
+
+# dealStatus.id retornado pela API -> status usado nas análises
+DEAL_STATUS_BY_ID = {1: 'ongoing', 2: 'won', 3: 'lost'}
+
+# objetos aninhados da API, substituídos pelas colunas extraídas
+NESTED_COLUMNS = ['owner', 'dealStage', 'organization']
+
+# tipos compactos do frame de negócios
+ID_COLUMNS = ['id', 'dealStatus_id', 'user_id', 'stage_id', 'stage_order', 'funnel_id', 'organization_id']
+CATEGORY_COLUMNS = ['dealStatus_name', 'user_name', 'stage_name', 'funnel_name', 'organization_name']
+
+
+def _nested(deals: List[Dict], key: str) -> List[Dict]:
+    # objeto aninhado de cada negócio ({} quando ausente ou inválido)
+    return [value if isinstance(value, dict) else {} for value in (deal.get(key) for deal in deals)]
+
+
+def _flatten_deals_page(deals: List[Dict]) -> pd.DataFrame:
+    # extrai os campos aninhados de uma página de negócios: cada objeto
+    # aninhado é lido uma vez e os campos saem em list comprehensions
+    df = pd.DataFrame(deals)
+    flat = {}
+    
+    # o agendor retorna dealStatus como objeto, precisa extrair
+    if 'dealStatus' in df.columns:
+        status = _nested(deals, 'dealStatus')
+        flat['dealStatus_id'] = [s.get('id') for s in status]
+        flat['dealStatus_name'] = [s.get('name') for s in status]
+        flat['dealStatus'] = [DEAL_STATUS_BY_ID.get(i) for i in flat['dealStatus_id']]
+    
+    if 'owner' in df.columns:
+        owner = _nested(deals, 'owner')
+        flat['user_id'] = [o.get('id') for o in owner]
+        flat['user_name'] = [o.get('name') for o in owner]
+    
+    if 'dealStage' in df.columns:
+        stage = _nested(deals, 'dealStage')
+        funnel = [s.get('funnel') or {} for s in stage]
+        flat['stage_id'] = [s.get('id') for s in stage]
+        flat['stage_name'] = [s.get('name') for s in stage]
+        flat['stage_order'] = [s.get('sequence') for s in stage]
+        flat['funnel_id'] = [f.get('id') for f in funnel]
+        flat['funnel_name'] = [f.get('name') for f in funnel]
+    
+    if 'organization' in df.columns:
+        organization = _nested(deals, 'organization')
+        flat['organization_id'] = [o.get('id') for o in organization]
+        flat['organization_name'] = [o.get('name') for o in organization]
+    
+    for column, values in flat.items():
+        df[column] = pd.Series(values, index=df.index)
+    
+    # objetos aninhados já foram extraídos; não precisam ficar no frame
+    return df.drop(columns=[c for c in NESTED_COLUMNS if c in df.columns])
+
+
+def build_deals_dataframe(pages: Iterable[List[Dict]]) -> pd.DataFrame:
+    """
+    Monta o DataFrame de negócios a partir de páginas da API
+    
+    Aceita qualquer iterável de páginas (ex.: AgendorClient.iter_deal_pages()):
+    cada página é achatada assim que chega, então a lista completa de
+    dicionários brutos nunca precisa existir na memória.
+    """
+    frames = [_flatten_deals_page(page) for page in pages if page]
+    if not frames:
+        return pd.DataFrame()
+    
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    
+    # converter datas
+    if 'createdAt' in df.columns:
+        df['createdAt'] = pd.to_datetime(df['createdAt'])
+    if 'updatedAt' in df.columns:
+        df['updatedAt'] = pd.to_datetime(df['updatedAt'])
+    if 'wonAt' in df.columns:
+        df['wonAt'] = pd.to_datetime(df['wonAt'])
+    if 'lostAt' in df.columns:
+        df['lostAt'] = pd.to_datetime(df['lostAt'])
+    
+    # data de fechamento: wonAt, ou lostAt para os perdidos
+    won_at = df['wonAt'] if 'wonAt' in df.columns else None
+    lost_at = df['lostAt'] if 'lostAt' in df.columns else None
+    if won_at is None or won_at.isna().all():
+        df['dealStatusDate'] = lost_at if lost_at is not None else pd.Series(pd.NaT, index=df.index)
+    elif lost_at is None or lost_at.isna().all():
+        df['dealStatusDate'] = won_at
+    else:
+        df['dealStatusDate'] = won_at.where(won_at.notna(), lost_at)
+    
+    # data de término usada nos filtros de período (igual ao Agendor):
+    # endTime, senão wonAt, senão lostAt, no horário local sem fuso
+    end_date = pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
+    for column in ('lostAt', 'wonAt', 'endTime'):
+        if column in df.columns:
+            parsed = _to_wall_time(df[column])
+            end_date = parsed.where(parsed.notna(), end_date)
+    df['endDate'] = end_date
+    
+    if 'value' in df.columns:
+        df['value'] = df['value'].fillna(0)
+    
+    return _compact_deals_frame(df)
+
+
+def _to_wall_time(values: pd.Series) -> pd.Series:
+    # datas da API como datetime sem fuso, mantendo o horário local informado
+    if pd.api.types.is_datetime64_any_dtype(values):
+        parsed = values.dt.tz_localize(None) if values.dt.tz is not None else values
+    else:
+        # texto ISO 8601: descarta o offset (que pode variar entre registros)
+        text = values.astype(object).where(values.notna(), None).astype('string')
+        text = text.str.replace(r'(Z|[+-]\d{2}:?\d{2})$', '', regex=True)
+        parsed = pd.to_datetime(text, errors='coerce', format='ISO8601')
+    return parsed.astype('datetime64[ns]')
+
+
+def _compact_deals_frame(df: pd.DataFrame) -> pd.DataFrame:
+    # ids em int32 (Int32 se houver nulos), rótulos repetidos como category
+    for column in ID_COLUMNS:
+        if column in df.columns:
+            numeric = pd.to_numeric(df[column], errors='coerce')
+            df[column] = numeric.astype('int32' if numeric.notna().all() else 'Int32')
+    
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    
+    if 'dealStatus' in df.columns:
+        df['dealStatus'] = pd.Categorical(df['dealStatus'], categories=list(DEAL_STATUS_BY_ID.values()))
+    
+    if 'value' in df.columns:
+        df['value'] = pd.to_numeric(df['value'], errors='coerce').fillna(0).astype('float64')
+    
+    return df
+
+
+def memoized(method):
+    """
+    Guarda o resultado de uma métrica na instância, por método e argumentos
+
+    O resultado é compartilhado entre chamadas: quem precisar alterar um
+    DataFrame/dict retornado deve trabalhar numa cópia.
+    """
+    signature = inspect.signature(method)
+    
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        key = (method.__name__, tuple(bound.arguments.values())[1:])
+        
+        cache = self._metrics_cache
+        if key not in cache:
+            cache[key] = method(self, *args, **kwargs)
+        return cache[key]
+    
+    return wrapper
 
 
 class AgendorAnalytics:
     
-    def __init__(self, deals: List[Dict], users: List[Dict], funnels: List[Dict]):
+    def __init__(self, deals: List[Dict], users: List[Dict], funnels: List[Dict],
+                 df_deals: Optional[pd.DataFrame] = None):
         self.deals = deals
         self.users = users
         self.funnels = funnels
         
-        self.df_deals = self._create_deals_dataframe()
+        self.df_deals = df_deals if df_deals is not None else self._create_deals_dataframe()
         self.df_users = self._create_users_dataframe()
         self.df_funnels = self._create_funnels_dataframe()
+        
+        # métricas já calculadas para esta versão dos dados (ver memoized)
+        self._metrics_cache = {}
+        self.data_version = 0
+    
+    @classmethod
+    def from_frame(cls, df_deals: pd.DataFrame, users: List[Dict], funnels: List[Dict]) -> 'AgendorAnalytics':
+        """Cria as análises sobre um frame já montado (ex.: saída de filter_deals)"""
+        return cls([], users, funnels, df_deals=df_deals)
+    
+    def invalidate_cache(self):
+        """Descarta as métricas calculadas; chamar sempre que os negócios mudarem"""
+        self._metrics_cache = {}
+        self.data_version += 1
+    
+    def update_deals(self, deals: List[Dict]):
+        """Substitui os negócios, reconstrói o DataFrame e invalida as métricas"""
+        self.deals = deals
+        self.df_deals = self._create_deals_dataframe()
+        self.invalidate_cache()
     
     def _create_deals_dataframe(self) -> pd.DataFrame:
         if not self.deals:
             return pd.DataFrame()
         
-        df = pd.DataFrame(self.deals)
-        
-        # converter datas
-        if 'createdAt' in df.columns:
-            df['createdAt'] = pd.to_datetime(df['createdAt'])
-        if 'updatedAt' in df.columns:
-            df['updatedAt'] = pd.to_datetime(df['updatedAt'])
-        if 'wonAt' in df.columns:
-            df['wonAt'] = pd.to_datetime(df['wonAt'])
-        if 'lostAt' in df.columns:
-            df['lostAt'] = pd.to_datetime(df['lostAt'])
-        
-        df['dealStatusDate'] = df.apply(
-            lambda row: row.get('wonAt') if pd.notna(row.get('wonAt')) else row.get('lostAt'),
-            axis=1
-        )
-        
-        if 'value' in df.columns:
-            df['value'] = df['value'].fillna(0)
-        
-        # o agendor retorna dealStatus como objeto, precisa extrair
-        if 'dealStatus' in df.columns:
-            df['dealStatus_id'] = df['dealStatus'].apply(lambda x: x.get('id') if isinstance(x, dict) else None)
-            df['dealStatus_name'] = df['dealStatus'].apply(lambda x: x.get('name') if isinstance(x, dict) else None)
-            df['dealStatus'] = df['dealStatus_id'].apply(lambda x: 
-                'ongoing' if x == 1 else ('won' if x == 2 else ('lost' if x == 3 else None))
-            )
-        
-        if 'owner' in df.columns:
-            df['user_id'] = df['owner'].apply(lambda x: x.get('id') if isinstance(x, dict) else None)
-            df['user_name'] = df['owner'].apply(lambda x: x.get('name') if isinstance(x, dict) else None)
-        
-        if 'dealStage' in df.columns:
-            df['stage_id'] = df['dealStage'].apply(lambda x: x.get('id') if isinstance(x, dict) else None)
-            df['stage_name'] = df['dealStage'].apply(lambda x: x.get('name') if isinstance(x, dict) else None)
-            df['stage_order'] = df['dealStage'].apply(lambda x: x.get('sequence') if isinstance(x, dict) else None)
-            df['funnel_id'] = df['dealStage'].apply(lambda x: x.get('funnel', {}).get('id') if isinstance(x, dict) else None)
-            df['funnel_name'] = df['dealStage'].apply(lambda x: x.get('funnel', {}).get('name') if isinstance(x, dict) else None)
-        
-        return df
+        return build_deals_dataframe([self.deals])
     
     def _create_users_dataframe(self) -> pd.DataFrame:
         if not self.users:
@@ -75,12 +219,13 @@ class AgendorAnalytics:
             return pd.DataFrame()
         return pd.DataFrame(self.funnels)
     
+    @memoized
     def calculate_conversion_rates(self) -> pd.DataFrame:
         if self.df_deals.empty:
             return pd.DataFrame()
         
         # Agrupar por funil e etapa
-        stage_counts = self.df_deals.groupby(['funnel_name', 'stage_name', 'stage_order']).size().reset_index(name='count')
+        stage_counts = self.df_deals.groupby(['funnel_name', 'stage_name', 'stage_order'], observed=True).size().reset_index(name='count')
         stage_counts = stage_counts.sort_values(['funnel_name', 'stage_order'])
         
         # Calcular taxa de conversão em relação à primeira etapa
@@ -101,6 +246,7 @@ class AgendorAnalytics:
         
         return pd.DataFrame(conversion_rates)
     
+    @memoized
     def calculate_win_loss_rate(self) -> Dict:
         # taxa de ganho vs perda
         if self.df_deals.empty:
@@ -139,6 +285,7 @@ class AgendorAnalytics:
     
     # ===== ANÁLISE DE TEMPO =====
     
+    @memoized
     def calculate_average_time_to_close(self) -> Dict:
         # tempo médio para fechar (ganhos e perdidos)
         if self.df_deals.empty:
@@ -162,6 +309,7 @@ class AgendorAnalytics:
             'tempo_maximo': int(closed_deals['days_to_close'].max()) if not closed_deals.empty else 0
         }
     
+    @memoized
     def calculate_time_in_stage(self) -> pd.DataFrame:
         # tempo médio em cada etapa (para negócios em andamento)
         if self.df_deals.empty:
@@ -177,7 +325,7 @@ class AgendorAnalytics:
         now = pd.Timestamp.now(tz='UTC')
         ongoing_deals['days_in_stage'] = (now - ongoing_deals['updatedAt']).dt.days
         
-        stage_time = ongoing_deals.groupby(['funnel_name', 'stage_name']).agg({
+        stage_time = ongoing_deals.groupby(['funnel_name', 'stage_name'], observed=True).agg({
             'days_in_stage': ['mean', 'median', 'max']
         }).reset_index()
         
@@ -188,46 +336,52 @@ class AgendorAnalytics:
     
     # ===== PERFORMANCE DE VENDEDORES =====
     
+    @memoized
     def calculate_seller_performance(self) -> pd.DataFrame:
-        # performance por vendedor
+        # performance por vendedor (uma única agregação agrupada por user_id)
         if self.df_deals.empty:
             return pd.DataFrame()
         
-        seller_metrics = []
+        deals = self.df_deals[self.df_deals['user_id'].notna()]
+        if deals.empty:
+            return pd.DataFrame()
         
-        for user_id in self.df_deals['user_id'].unique():
-            if pd.isna(user_id):
-                continue
-            
-            user_deals = self.df_deals[self.df_deals['user_id'] == user_id]
-            user_name = user_deals.iloc[0]['user_name']
-            
-            total_deals = len(user_deals)
-            won_deals = len(user_deals[user_deals['dealStatus'] == 'won'])
-            lost_deals = len(user_deals[user_deals['dealStatus'] == 'lost'])
-            ongoing_deals = len(user_deals[user_deals['dealStatus'] == 'ongoing'])
-            
-            total_value = user_deals[user_deals['dealStatus'] == 'won']['value'].sum()
-            avg_deal_value = user_deals[user_deals['dealStatus'] == 'won']['value'].mean()
-            
-            win_rate = (won_deals / (won_deals + lost_deals) * 100) if (won_deals + lost_deals) > 0 else 0
-            
-            seller_metrics.append({
-                'vendedor': user_name,
-                'total_negocios': total_deals,
-                'ganhos': won_deals,
-                'perdidos': lost_deals,
-                'em_andamento': ongoing_deals,
-                'taxa_vitoria': round(win_rate, 2),
-                'valor_total': round(total_value, 2),
-                'ticket_medio': round(avg_deal_value, 2) if not pd.isna(avg_deal_value) else 0
-            })
+        status = deals['dealStatus']
+        is_won = status == 'won'
+        
+        grouped = pd.DataFrame({
+            'user_id': deals['user_id'],
+            'user_name': deals['user_name'],
+            'won': is_won,
+            'lost': status == 'lost',
+            'ongoing': status == 'ongoing',
+            'won_value': deals['value'].where(is_won)
+        }).groupby('user_id', sort=False, observed=True)
+        
+        df = grouped.agg(
+            vendedor=('user_name', 'first'),
+            total_negocios=('won', 'size'),
+            ganhos=('won', 'sum'),
+            perdidos=('lost', 'sum'),
+            em_andamento=('ongoing', 'sum'),
+            valor_total=('won_value', 'sum'),
+            ticket_medio=('won_value', 'mean')
+        ).reset_index(drop=True)
+        
+        df['vendedor'] = df['vendedor'].astype(object)
+        
+        closed = df['ganhos'] + df['perdidos']
+        win_rate = (df['ganhos'] / closed.where(closed > 0) * 100).fillna(0)
+        df.insert(5, 'taxa_vitoria', win_rate.round(2))
+        
+        df['valor_total'] = df['valor_total'].round(2)
+        df['ticket_medio'] = df['ticket_medio'].round(2).fillna(0)
         
-        df = pd.DataFrame(seller_metrics)
         return df.sort_values('valor_total', ascending=False)
     
     # ===== ANÁLISE DE RECEITA =====
     
+    @memoized
     def calculate_revenue_forecast(self) -> Dict:
         # previsão de receita simples baseada em pipeline
         if self.df_deals.empty:
@@ -259,6 +413,7 @@ class AgendorAnalytics:
             'total_negocios_abertos': len(ongoing)
         }
     
+    @memoized
     def calculate_revenue_by_period(self, period: str = 'M') -> pd.DataFrame:
         # receita agregada por período (M/W/D)
         if self.df_deals.empty:
@@ -284,6 +439,7 @@ class AgendorAnalytics:
     
     # ===== ANÁLISE DE PERDAS =====
     
+    @memoized
     def analyze_lost_deals(self) -> Dict:
         # análise resumida de negócios perdidos
         if self.df_deals.empty:
@@ -311,6 +467,7 @@ class AgendorAnalytics:
     
     # ===== TENDÊNCIAS =====
     
+    @memoized
     def calculate_growth_trend(self) -> Dict:
         # tendência de receita comparando últimos períodos
         if self.df_deals.empty:
@@ -351,6 +508,7 @@ class AgendorAnalytics:
     
     # ===== ANÁLISE DE CLIENTES =====
     
+    @memoized
     def calculate_top_customers(self, limit: int = 5) -> pd.DataFrame:
         # top N clientes por receita
         if self.df_deals.empty:
@@ -358,13 +516,11 @@ class AgendorAnalytics:
         
         won_deals = self.df_deals[self.df_deals['dealStatus'] == 'won'].copy()
         
-        if won_deals.empty or 'organization' not in won_deals.columns:
+        if won_deals.empty or 'organization_name' not in won_deals.columns:
             return pd.DataFrame()
         
-        # Extrair nome da organização
-        won_deals['customer_name'] = won_deals['organization'].apply(
-            lambda x: x.get('name') if isinstance(x, dict) else 'Sem Organização'
-        )
+        # Nome da organização
+        won_deals['customer_name'] = won_deals['organization_name'].astype(object).fillna('Sem Organização')
         
         # Agrupar por cliente
         customer_revenue = won_deals.groupby('customer_name').agg({
@@ -386,6 +542,7 @@ class AgendorAnalytics:
     
     # ===== ANÁLISE DE SEGMENTOS =====
     
+    @memoized
     def calculate_top_segments(self, limit: int = 5) -> pd.DataFrame:
         # top N segmentos por receita (identificação por palavras-chave)
         if self.df_deals.empty:
@@ -393,46 +550,15 @@ class AgendorAnalytics:
         
         won_deals = self.df_deals[self.df_deals['dealStatus'] == 'won'].copy()
         
-        if won_deals.empty or 'organization' not in won_deals.columns:
+        if won_deals.empty or 'organization_name' not in won_deals.columns:
             return pd.DataFrame()
         
-        # Extrair nome da organização
-        won_deals['customer_name'] = won_deals['organization'].apply(
-            lambda x: x.get('name', '') if isinstance(x, dict) else ''
-        )
-        
-        # Identificar segmento a partir de palavras-chave no nome
-        def identify_segment(name):
-            name_lower = str(name).lower()
-            
-            # Palavras-chave para identificar segmentos
-            if any(word in name_lower for word in ['miner', 'mineração', 'mineracao', 'minera']):
-                return 'Mineração'
-            elif any(word in name_lower for word in ['constru', 'obras', 'engenharia']):
-                return 'Construção/Engenharia'
-            elif any(word in name_lower for word in ['cimento', 'concreto']):
-                return 'Cimento/Concreto'
-            elif any(word in name_lower for word in ['industria', 'indústria', 'fabrica', 'fábrica']):
-                return 'Indústria'
-            elif any(word in name_lower for word in ['energia', 'eletric', 'hidrel']):
-                return 'Energia'
-            elif any(word in name_lower for word in ['metal', 'siderur', 'aço', 'aco']):
-                return 'Metalurgia/Siderurgia'
-            elif any(word in name_lower for word in ['agricola', 'agrícola', 'agro']):
-                return 'Agronegócio'
-            elif any(word in name_lower for word in ['quimic', 'química']):
-                return 'Química'
-            elif any(word in name_lower for word in ['transport', 'logistic']):
-                return 'Transporte/Logística'
-            elif any(word in name_lower for word in ['prefeitura', 'governo', 'municipal']):
-                return 'Setor Público'
-            else:
-                return 'Outros'
-        
-        won_deals['segmento'] = won_deals['customer_name'].apply(identify_segment)
+        # Segmento a partir de palavras-chave no nome da organização
+        # (classifica cada nome distinto uma vez só, ver segments.py)
+        won_deals['segmento'] = classify_segments(won_deals['organization_name'])
         
         # Agrupar por segmento
-        segment_revenue = won_deals.groupby('segmento').agg({
+        segment_revenue = won_deals.groupby('segmento', observed=True).agg({
             'value': 'sum',
             'id': 'count'
         }).reset_index()
@@ -451,6 +577,7 @@ class AgendorAnalytics:
     
     # ===== ESTIMATIVAS E PREVISÕES =====
     
+    @memoized
     def calculate_proposals_per_sale(self) -> Dict:
         # quantas propostas EM MÉDIA são necessárias para fechar 1 venda
         if self.df_deals.empty:
@@ -481,6 +608,7 @@ class AgendorAnalytics:
             'total_vendas': len(won_deals)
         }
     
+    @memoized
     def calculate_proposals_for_target(self, target_revenue: float = 100000) -> Dict:
         # quantas propostas para atingir meta (ticket médio × taxa de conversão)
         if self.df_deals.empty:
@@ -517,6 +645,7 @@ class AgendorAnalytics:
             'meta_receita': target_revenue
         }
     
+    @memoized
     def calculate_visits_to_close(self) -> Dict:
         # estimativa de visitas necessárias para fechar (proxy baseado em tempo e recorrência)
         if self.df_deals.empty:
@@ -552,10 +681,8 @@ class AgendorAnalytics:
         avg_days_to_close = won_deals_with_dates['days_to_close'].mean()
         
         # Calcular recorrência por cliente
-        if 'organization' in won_deals.columns:
-            won_deals['customer_id'] = won_deals['organization'].apply(
-                lambda x: x.get('id') if isinstance(x, dict) else None
-            )
+        if 'organization_id' in won_deals.columns:
+            won_deals['customer_id'] = won_deals['organization_id']
             
             # Negócios por cliente
             customer_frequency = won_deals.groupby('customer_id').size()
@@ -579,6 +706,7 @@ class AgendorAnalytics:
     
     # ===== INSIGHTS AUTOMÁTICOS =====
     
+    @memoized
     def generate_insights(self) -> Dict:
         """Gera insights automáticos e alertas baseados nos dados"""
         insights = {
@@ -0,0 +1,223 @@
+"""
+Cliente assíncrono para API do Agendor CRM
+Mesma interface do AgendorClient, com todos os endpoints e suas páginas
+buscados em paralelo num único event loop
+"""
+
+import asyncio
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from config import API_BASE_URL, HEADERS, PAGE_SIZE, MAX_CONCURRENT_PAGES, REQUEST_TIMEOUT, MAX_RETRIES
+from agendor_client import (
+    AgendorClient, AgendorAPIError, RequestThrottle, RETRY_STATUS_CODES,
+    parse_retry_after, backoff_delay
+)
+
+
+class AsyncAgendorClient:
+    """
+    Uso:
+        async with AsyncAgendorClient() as client:
+            deals, users = await asyncio.gather(client.get_deals(), client.get_users())
+
+    max_concurrency limita as requisições em voo somadas de todos os
+    endpoints; o ritmo (RequestThrottle) pode ser compartilhado com um
+    AgendorClient para respeitar o mesmo rate limit.
+    """
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENT_PAGES * 2,
+                 throttle: Optional[RequestThrottle] = None):
+        self.base_url = API_BASE_URL
+        self.headers = HEADERS
+        self.max_concurrency = max(1, max_concurrency)
+        self.throttle = throttle or RequestThrottle()
+        self.session = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        self.session = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=REQUEST_TIMEOUT,
+            limits=httpx.Limits(max_connections=self.max_concurrency)
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.aclose()
+        self.session = None
+
+    async def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
+        url = f"{self.base_url}/{endpoint}"
+        error = None
+
+        for attempt in range(MAX_RETRIES + 1):
+            wait = self.throttle.reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            retry_after = None
+            try:
+                async with self._semaphore:
+                    response = await self.session.get(url, params=params)
+            except httpx.TransportError as e:
+                error = e
+            except httpx.HTTPError as e:
+                # demais erros do httpx (redirects, decodificação...): mesmo
+                # tipo de erro do AgendorClient
+                raise AgendorAPIError(f"Falha em {endpoint}: {e}") from e
+            else:
+                if response.status_code in RETRY_STATUS_CODES:
+                    error = f"HTTP {response.status_code}"
+                    retry_after = parse_retry_after(response.headers)
+                    if response.status_code == 429:
+                        self.throttle.on_throttled(retry_after)
+                else:
+                    self.throttle.on_success(response.headers)
+                    try:
+                        response.raise_for_status()
+                        return response.json()
+                    except (httpx.HTTPStatusError, ValueError) as e:
+                        print(f"Erro na requisição: {e}")
+                        return {"data": []}
+
+            if attempt < MAX_RETRIES:
+                await asyncio.sleep(backoff_delay(attempt, retry_after))
+
+        raise AgendorAPIError(f"Falha em {endpoint} após {MAX_RETRIES + 1} tentativas: {error}")
+
+    async def _fetch_page(self, endpoint: str, params: Dict, page: int) -> List[Dict]:
+        page_params = dict(params, page=page, per_page=PAGE_SIZE)
+        response = await self._make_request(endpoint, page_params)
+
+        if not response or 'data' not in response:
+            return []
+
+        return response['data'] or []
+
+    async def _get_all_pages(self, endpoint: str, params: Optional[Dict] = None) -> List[Dict]:
+        # mesma janela deslizante do AgendorClient, com tasks em vez de
+        # threads: a página 1 vai sozinha e a janela só abre se ela vier cheia
+        params = params or {}
+        all_data = await self._fetch_page(endpoint, params, 1)
+        if len(all_data) < PAGE_SIZE:
+            return all_data
+
+        next_page = 2
+        pending = deque()
+
+        try:
+            for _ in range(self.max_concurrency):
+                pending.append(asyncio.ensure_future(self._fetch_page(endpoint, params, next_page)))
+                next_page += 1
+
+            while pending:
+                data = await pending.popleft()
+                all_data.extend(data)
+
+                if len(data) < PAGE_SIZE:
+                    break
+
+                pending.append(asyncio.ensure_future(self._fetch_page(endpoint, params, next_page)))
+                next_page += 1
+        finally:
+            for task in pending:
+                task.cancel()
+
+        return all_data
+
+    async def fetch_deals(self, status: Optional[str] = None) -> List[Dict]:
+        params = {}
+        if status:
+            params['status'] = status
+
+        return await self._get_all_pages('deals', params)
+
+    async def get_deals(self, status: Optional[str] = None) -> List[Dict]:
+        return await self.fetch_deals(status)
+
+    async def get_deals_updated_since(self, since: str) -> List[Dict]:
+        return await self._get_all_pages('deals', {'updatedDateGt': since})
+
+    async def get_deals_won(self) -> List[Dict]:
+        return await self.get_deals(status='won')
+
+    async def get_deals_lost(self) -> List[Dict]:
+        return await self.get_deals(status='lost')
+
+    async def get_deals_ongoing(self) -> List[Dict]:
+        return await self.get_deals(status='ongoing')
+
+    async def get_people(self) -> List[Dict]:
+        return await self._get_all_pages('people')
+
+    async def get_organizations(self) -> List[Dict]:
+        return await self._get_all_pages('organizations')
+
+    async def get_funnels(self) -> List[Dict]:
+        response = await self._make_request('funnels')
+        return response.get('data', [])
+
+    async def get_products(self) -> List[Dict]:
+        return await self._get_all_pages('products')
+
+    async def get_users(self) -> List[Dict]:
+        response = await self._make_request('users')
+        return response.get('data', [])
+
+    async def get_tasks(self, status: Optional[str] = None) -> List[Dict]:
+        params = {}
+        if status:
+            params['status'] = status
+
+        return await self._get_all_pages('tasks', params)
+
+    async def test_connection(self) -> bool:
+        try:
+            response = await self.session.get(f"{self.base_url}/users")
+            return response.status_code == 200
+        except httpx.HTTPError:
+            return False
+
+
+async def _load_dashboard_data(client: AgendorClient, full: bool):
+    since = None if full else client.deals_since()
+
+    async with AsyncAgendorClient(throttle=client.throttle) as api:
+        api.base_url = client.base_url
+        deals_call = api.fetch_deals() if since is None else api.get_deals_updated_since(since)
+        connected, deals, users, funnels = await asyncio.gather(
+            api.test_connection(), deals_call, api.get_users(), api.get_funnels()
+        )
+
+    return connected, since is None, deals, users, funnels
+
+
+def load_dashboard_data(client: AgendorClient, full: bool = False) -> Tuple[Optional[List[Dict]], Optional[List[Dict]], Optional[List[Dict]]]:
+    """
+    Carrega negócios, usuários e funis de uma vez, em paralelo
+
+    Os negócios seguem a sincronização incremental do client (download
+    completo com snapshot vazio, a cada FULL_SYNC_INTERVAL ou com
+    full=True) e o resultado é gravado no snapshot e no armazenamento
+    local dele.
+
+    Returns:
+        (deals, users, funnels), ou (None, None, None) se a conexão falhar
+    """
+    client.load_snapshot()
+    connected, full, deals, users, funnels = asyncio.run(_load_dashboard_data(client, full))
+
+    if not connected:
+        return None, None, None
+
+    if client.store is not None:
+        if users:
+            client.store.save('users', users)
+        if funnels:
+            client.store.save('funnels', funnels)
+
+    return client.apply_deals(deals, full=full), users, funnels
@@ -0,0 +1,174 @@
+"""
+Benchmark das métricas do AgendorAnalytics em vários tamanhos de conta
+Mede tempo (menor e mediana de N execuções) e pico de memória (tracemalloc)
+da montagem do DataFrame e de cada métrica, com dados do mock_agendor.py
+
+Uso:
+    python bench_analytics.py
+    python bench_analytics.py --sizes 10000 100000 500000 --repeat 3 --output bench/atual.json
+    python bench_analytics.py --sizes 10000 --compare bench/anterior.json
+"""
+
+import argparse
+import gc
+import inspect
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from analytics import AgendorAnalytics
+from mock_agendor import SyntheticAgendor
+
+
+DEFAULT_SIZES = [10000, 100000, 500000]
+
+
+def metric_methods() -> List[str]:
+    """Métricas medidas: todo calculate_*/analyze_* e o generate_insights"""
+    names = [
+        name for name, _ in inspect.getmembers(AgendorAnalytics, inspect.isfunction)
+        if name.startswith(('calculate_', 'analyze_'))
+    ]
+    return names + ['generate_insights']
+
+
+def measure(run: Callable[[], object], repeat: int, setup: Optional[Callable[[], None]] = None) -> Dict:
+    """
+    Tempo de `repeat` execuções e pico de memória de uma execução extra
+
+    O pico é medido à parte: o tracemalloc deixa o código bem mais lento e
+    distorceria os tempos. `setup` roda antes de cada execução, fora da medição.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    if setup:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'tempo_min_s': round(min(times), 6),
+        'tempo_mediana_s': round(statistics.median(times), 6),
+        'pico_memoria_mb': round(peak / 2 ** 20, 3),
+    }
+
+
+def bench_size(size: int, repeat: int, seed: int, methods: List[str]) -> List[Dict]:
+    """Mede montagem do DataFrame e todas as métricas para uma conta de `size` negócios"""
+    dataset = SyntheticAgendor(size, seed=seed)
+    deals = dataset.all_deals()
+    results = []
+
+    analytics = AgendorAnalytics([], dataset.users, dataset.funnels)
+    analytics.deals = deals
+    stats = measure(analytics._create_deals_dataframe, repeat)
+    results.append({'tamanho': size, 'metrica': '_create_deals_dataframe', **stats})
+    print(f"  {size:>9,}  {'_create_deals_dataframe':<36} {stats['tempo_min_s']:>9.4f}s "
+          f"{stats['pico_memoria_mb']:>9.1f} MB", file=sys.stderr)
+
+    analytics = AgendorAnalytics.from_frame(analytics._create_deals_dataframe(), dataset.users, dataset.funnels)
+    del deals
+
+    for name in methods:
+        # cache limpo a cada execução: cada métrica é medida a frio, inclusive
+        # as que chamam outras (ex.: generate_insights)
+        stats = measure(getattr(analytics, name), repeat, setup=analytics.invalidate_cache)
+        results.append({'tamanho': size, 'metrica': name, **stats})
+        print(f"  {size:>9,}  {name:<36} {stats['tempo_min_s']:>9.4f}s "
+              f"{stats['pico_memoria_mb']:>9.1f} MB", file=sys.stderr)
+
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[Dict], baseline_path: str) -> None:
+    """Imprime a razão atual/base do tempo e da memória de cada métrica"""
+    with open(baseline_path, encoding='utf-8') as file:
+        baseline = json.load(file)
+
+    previous = {(row['tamanho'], row['metrica']): row for row in baseline['resultados']}
+    print(f"\nComparação com {baseline_path} (commit {baseline['meta'].get('commit')}):", file=sys.stderr)
+    for row in results:
+        base = previous.get((row['tamanho'], row['metrica']))
+        if not base:
+            continue
+        time_ratio = row['tempo_min_s'] / base['tempo_min_s'] if base['tempo_min_s'] else float('nan')
+        memory_ratio = (row['pico_memoria_mb'] / base['pico_memoria_mb']
+                        if base['pico_memoria_mb'] else float('nan'))
+        print(f"  {row['tamanho']:>9,}  {row['metrica']:<36} tempo x{time_ratio:5.2f}  memória x{memory_ratio:5.2f}",
+              file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das métricas do AgendorAnalytics")
+    parser.add_argument("--sizes", type=int, nargs='+', default=DEFAULT_SIZES, help="quantidades de negócios")
+    parser.add_argument("--repeat", type=int, default=3, help="execuções cronometradas por métrica")
+    parser.add_argument("--seed", type=int, default=0, help="semente dos dados sintéticos")
+    parser.add_argument("--only", nargs='+', help="mede só estas métricas")
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: stdout)")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args()
+
+    methods = args.only or metric_methods()
+    results = []
+    for size in args.sizes:
+        print(f"📊 {size:,} negócios", file=sys.stderr)
+        results.extend(bench_size(size, args.repeat, args.seed, methods))
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'plataforma': platform.platform(),
+            'repeticoes': args.repeat,
+            'semente': args.seed,
+        },
+        'resultados': results,
+    }
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output + '\n')
+        print(f"\n✅ Resultados salvos em {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Benchmark de ponta a ponta do dashboard (execução completa do script)
+Roda o dashboard.py sem navegador com o AppTest do Streamlit e mede o
+tempo de cada execução por aba e por combinação de filtros, com dados do
+mock_agendor.py no lugar da API
+
+Pega o que o bench_analytics.py não vê: funções de renderização, montagem
+dos gráficos Plotly e o custo do próprio rerun.
+
+Uso:
+    python bench_dashboard.py
+    python bench_dashboard.py --sizes 10000 100000 --repeat 3 --output bench/dashboard.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict
+
+import pandas as pd
+import streamlit as st
+from streamlit.logger import set_log_level
+from streamlit.testing.v1 import AppTest
+
+import agendor_client
+import shared_dataset
+from bench_analytics import git_commit
+from deal_filters import ALL_PERIODS, ALL_SELLERS, CUSTOM_PERIOD
+from deal_sync import DealSnapshot
+from mock_agendor import SyntheticAgendor
+
+
+DEFAULT_SIZES = [10000, 100000]
+
+DASHBOARD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dashboard.py')
+
+PERIOD_LABEL = "Selecione o período:"
+SELLER_LABEL = "Selecione vendedor(es):"
+
+# combinações de filtros medidas: (nome, período, vendedores a escolher)
+SCENARIOS = [
+    ("Todos os dados", ALL_PERIODS, 0),
+    ("Último mês", "Último mês", 0),
+    ("Personalizado", CUSTOM_PERIOD, 0),
+    ("Vários vendedores", ALL_PERIODS, 3),
+]
+
+
+class OfflineClient:
+    """Cliente sem API nem armazenamento local: os dados vêm do load_dashboard_data substituído"""
+
+    store = None
+
+    def __init__(self):
+        self.deal_snapshot = DealSnapshot()
+
+
+def use_synthetic_data(dataset: SyntheticAgendor) -> None:
+    """Troca a carga da API pelos dados sintéticos (vale para as próximas execuções do script)"""
+    deals = dataset.all_deals()
+    users, funnels = dataset.users, dataset.funnels_payload()
+    shared_dataset.load_dashboard_data = lambda client, full=False: (deals, users, funnels)
+    agendor_client.AgendorClient = OfflineClient
+
+    # dados, análises e relatórios ficam em st.cache_resource, global no
+    # processo: sem limpar, o tamanho anterior seria reaproveitado
+    st.cache_resource.clear()
+    st.cache_data.clear()
+
+
+def timed_run(app: AppTest) -> float:
+    """Executa o script uma vez; falha se o dashboard levantou exceção"""
+    start = time.perf_counter()
+    app.run()
+    elapsed = time.perf_counter() - start
+    if app.exception:
+        raise RuntimeError(f"Erro no dashboard: {app.exception[0].value}")
+    return elapsed
+
+
+def widget(elements, label: str):
+    return next(element for element in elements if element.label == label)
+
+
+def apply_filters(app: AppTest, period: str, seller_count: int) -> float:
+    """Aplica o período e os vendedores; retorna o tempo das execuções disparadas"""
+    elapsed = 0.0
+
+    widget(app.radio, PERIOD_LABEL).set_value(period)
+    elapsed += timed_run(app)
+
+    if period == CUSTOM_PERIOD:
+        today = date.today()
+        app.date_input[0].set_value(today - timedelta(days=180))
+        app.date_input[1].set_value(today)
+        elapsed += timed_run(app)
+
+    sellers = widget(app.multiselect, SELLER_LABEL)
+    names = [name for name in sellers.options if name != ALL_SELLERS]
+    sellers.set_value(names[:seller_count] if seller_count else [ALL_SELLERS])
+    elapsed += timed_run(app)
+
+    return elapsed
+
+
+def bench_size(size: int, repeat: int, seed: int, timeout: float) -> Dict:
+    """Mede carga inicial, filtros e abas do dashboard com `size` negócios"""
+    use_synthetic_data(SyntheticAgendor(size, seed=seed))
+
+    app = AppTest.from_file(DASHBOARD_PATH, default_timeout=timeout)
+    app.session_state['authenticated'] = True
+    app.session_state['user_email'] = 'benchmark@exemplo.com.br'
+
+    # primeira execução: monta o DataFrame compartilhado e a aba inicial
+    initial = timed_run(app)
+    print(f"  {size:>9,}  carga inicial {initial:>36.3f}s", file=sys.stderr)
+
+    tabs = app.radio(key='active_tab').options
+    filters = []
+    runs = []
+
+    for scenario, period, seller_count in SCENARIOS:
+        elapsed = apply_filters(app, period, seller_count)
+        filters.append({'tamanho': size, 'filtro': scenario, 'aplicar_filtro_s': round(elapsed, 4)})
+        print(f"  {size:>9,}  {scenario:<22} aplicar filtro {elapsed:>12.3f}s", file=sys.stderr)
+
+        for tab in tabs:
+            app.radio(key='active_tab').set_value(tab)
+            switch = timed_run(app)
+            # rerun sem mudança: o custo mínimo de qualquer clique na aba
+            reruns = [timed_run(app) for _ in range(repeat)]
+            runs.append({
+                'tamanho': size,
+                'filtro': scenario,
+                'aba': tab,
+                'troca_aba_s': round(switch, 4),
+                'rerun_min_s': round(min(reruns), 4),
+                'rerun_mediana_s': round(statistics.median(reruns), 4),
+            })
+            print(f"  {size:>9,}  {scenario:<22} {tab:<24} {switch:>7.3f}s  rerun {min(reruns):.3f}s",
+                  file=sys.stderr)
+
+    return {'carga_inicial': {'tamanho': size, 'tempo_s': round(initial, 4)}, 'filtros': filters, 'abas': runs}
+
+
+def main():
+    # avisos do Streamlit (ex.: use_container_width) a cada execução poluem a saída
+    set_log_level('error')
+
+    parser = argparse.ArgumentParser(description="Benchmark de ponta a ponta do dashboard")
+    parser.add_argument("--sizes", type=int, nargs='+', default=DEFAULT_SIZES, help="quantidades de negócios")
+    parser.add_argument("--repeat", type=int, default=3, help="reruns cronometrados por aba")
+    parser.add_argument("--seed", type=int, default=0, help="semente dos dados sintéticos")
+    parser.add_argument("--timeout", type=float, default=300, help="limite por execução do script (s)")
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args()
+
+    results = {'carga_inicial': [], 'filtros': [], 'abas': []}
+    for size in args.sizes:
+        print(f"📊 {size:,} negócios", file=sys.stderr)
+        measured = bench_size(size, args.repeat, args.seed, args.timeout)
+        results['carga_inicial'].append(measured['carga_inicial'])
+        results['filtros'].extend(measured['filtros'])
+        results['abas'].extend(measured['abas'])
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'streamlit': st.__version__,
+            'plataforma': platform.platform(),
+            'repeticoes': args.repeat,
+            'semente': args.seed,
+        },
+        'resultados': results,
+    }
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output + '\n')
+        print(f"\n✅ Resultados salvos em {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
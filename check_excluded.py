@@ -1,18 +1,19 @@
 from agendor_client import AgendorClient
 
 client = AgendorClient()
-deals = client.get_deals()
 
 # IDs dos negócios excluídos
 excluded_ids = [35941469, 34841211]
+deals_by_id = client.find_deals(excluded_ids)
 
 print("=" * 80)
 print("NEGÓCIOS EXCLUÍDOS DO RELATÓRIO DO AGENDOR")
 print("=" * 80)
 print()
 
-for deal in deals:
-    if deal.get('id') in excluded_ids:
+for deal_id in excluded_ids:
+    deal = deals_by_id.get(deal_id)
+    if deal:
         print(f"ID: {deal.get('id')}")
         print(f"Título: {deal.get('title')}")
         print(f"Valor: R$ {deal.get('value', 0):,.2f}")
@@ -2,7 +2,6 @@ from agendor_client import AgendorClient
 import json
 
 client = AgendorClient()
-deals = client.get_deals()
 
 # IDs incluídos e excluídos
 included_ids = [37108680, 37108685, 37108711, 33290083, 34766997, 36556576]
@@ -13,14 +12,9 @@ print("COMPARANDO CAMPOS DOS NEGÓCIOS")
 print("=" * 80)
 
 # Pegar 1 incluído e 1 excluído para comparar estrutura
-included_sample = None
-excluded_sample = None
-
-for deal in deals:
-    if deal.get('id') == included_ids[0]:
-        included_sample = deal
-    if deal.get('id') == excluded_ids[0]:
-        excluded_sample = deal
+samples = client.find_deals([included_ids[0], excluded_ids[0]])
+included_sample = samples.get(included_ids[0])
+excluded_sample = samples.get(excluded_ids[0])
 
 if included_sample and excluded_sample:
     # Comparar campos principais
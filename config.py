@@ -23,7 +23,8 @@ if not AGENDOR_TOKEN:
     raise ValueError("Token do Agendor não configurado! Configure AGENDOR_TOKEN nas secrets do Streamlit, config_local.py ou como variável de ambiente.")
 
 # Base URL da API
-API_BASE_URL = "https://api.agendor.com.br/v3"
+# (AGENDOR_API_URL aponta para outro servidor, ex.: mock_agendor.py)
+API_BASE_URL = os.getenv("AGENDOR_API_URL", "https://api.agendor.com.br/v3")
 
 # Headers para requisições
 HEADERS = {
@@ -31,6 +32,29 @@ HEADERS = {
     "Content-Type": "application/json"
 }
 
+# Paginação: registros por página e páginas buscadas em paralelo
+PAGE_SIZE = 100
+MAX_CONCURRENT_PAGES = 4
+
+# Requisições: timeout (s), novas tentativas em 429/5xx e teto do backoff (s)
+REQUEST_TIMEOUT = 30
+MAX_RETRIES = 5
+MAX_BACKOFF = 60
+
+# Armazenamento local dos dados (vazio desativa) e validade em segundos
+LOCAL_STORE_PATH = os.getenv("AGENDOR_STORE_PATH", ".agendor_store.sqlite3")
+LOCAL_STORE_MAX_AGE = 300
+
+# Intervalo (s) entre downloads completos de negócios: a sincronização
+# incremental não enxerga negócios excluídos no Agendor
+FULL_SYNC_INTERVAL = 6 * 60 * 60
+
+# Análises em cache por combinação de filtros (as menos usadas saem primeiro)
+ANALYTICS_CACHE_SIZE = 16
+
+# Relatórios Excel prontos em cache (mesma chave das análises)
+REPORT_CACHE_SIZE = 8
+
 # Configurações do dashboard
 DASHBOARD_TITLE = "Dashboard Gerencial - CRM"
 PAGE_ICON = "📊"
@@ -9,14 +9,20 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
 from datetime import datetime
+from io import BytesIO
 import sys
+import threading
 
-from config import DASHBOARD_TITLE, PAGE_ICON, LAYOUT
-from agendor_client import AgendorClient
+from config import DASHBOARD_TITLE, PAGE_ICON, LAYOUT, ANALYTICS_CACHE_SIZE
+from agendor_client import AgendorClient, AgendorAPIError
 from analytics import AgendorAnalytics
+from shared_dataset import SharedDataset
+from report_jobs import ReportJobs
+from deal_filters import filter_deals, filter_signature, PERIOD_OPTIONS, PERIOD_PRESETS, CUSTOM_PERIOD, ALL_SELLERS
 from auth import require_auth, logout
 from metas_manager import get_meta_mes, set_meta_mes, calcular_progresso, calcular_projecao_mes
 from excel_export import generate_excel_report
+from data_export import write_deals_export, EXPORT_FORMATS
 import calendar
 from datetime import datetime
 
@@ -112,23 +118,184 @@ st.markdown("""
     """, unsafe_allow_html=True)
 
 
-@st.cache_data(ttl=300)  # Cache por 5 minutos
+@st.cache_resource
+def get_client():
+    """Cliente compartilhado, mantém o snapshot da sincronização incremental"""
+    return AgendorClient()
+
+
+@st.cache_resource
+def get_shared_dataset():
+    """Dados do Agendor compartilhados por todas as sessões do processo"""
+    shared = SharedDataset(get_client())
+    # sincroniza em segundo plano: nenhuma página espera pela API
+    shared.start()
+    return shared
+
+
 def load_data():
-    """Carrega dados da API do Agendor"""
-    client = AgendorClient()
+    """Dataset compartilhado; só a primeira carga do processo espera pela API"""
+    shared = get_shared_dataset()
     
     with st.spinner('🔄 Conectando ao Agendor...'):
-        # Testar conexão
-        if not client.test_connection():
+        # Testa a conexão e busca tudo em paralelo
+        # (negócios: apenas os alterados desde a última sincronização)
+        try:
+            dataset = shared.get()
+        except AgendorAPIError as e:
+            st.error(f"❌ A API do Agendor não respondeu: {e}")
+            return None
+        
+        if dataset is None:
             st.error("❌ Erro ao conectar com a API do Agendor. Verifique o token.")
-            return None, None, None
-        
-        # Buscar dados
-        deals = client.get_deals()
-        users = client.get_users()
-        funnels = client.get_funnels()
+            return None
+    
+    if shared.last_error is not None:
+        st.warning(f"⚠️ Exibindo dados de {datetime.fromtimestamp(dataset.loaded_at).strftime('%d/%m/%Y %H:%M')}: "
+                   f"a última atualização falhou ({shared.last_error})")
+    
+    return dataset
+
+
+@st.cache_resource(max_entries=ANALYTICS_CACHE_SIZE)
+def get_analytics(_df_deals, _users, _funnels, data_version, signature):
+    """
+    AgendorAnalytics dos negócios filtrados, compartilhado entre reruns
+
+    A chave é a versão dos dados mais a assinatura dos filtros
+    (filter_signature); voltar a uma seleção já vista reaproveita o frame
+    filtrado e as métricas já calculadas.
+    """
+    period, dates, sellers = signature
+    start_date, end_date = dates if period == CUSTOM_PERIOD else (None, None)
+    # períodos pré-definidos contam a partir do dia da assinatura: o mesmo
+    # resultado para a mesma chave, não importa a hora em que foi calculado
+    now = pd.Timestamp(dates[0]) if period in PERIOD_PRESETS else None
+    filtered_df = filter_deals(_df_deals, period, start_date, end_date, list(sellers), now=now)
+    return AgendorAnalytics.from_frame(filtered_df, _users, _funnels)
+
+
+@st.cache_resource
+def get_analytics_state():
+    """Versão dos dados das análises em cache (ver drop_stale_analytics)"""
+    return {'version': None, 'lock': threading.Lock()}
+
+
+def drop_stale_analytics(data_version):
+    """
+    Descarta as análises em cache quando sai uma versão nova dos dados
+
+    Entradas de versões anteriores nunca mais seriam usadas, mas ficariam
+    na memória (frames filtrados e métricas) até saírem pelo max_entries.
+    """
+    state = get_analytics_state()
+    with state['lock']:
+        if state['version'] is None or data_version > state['version']:
+            if state['version'] is not None:
+                get_analytics.clear()
+            state['version'] = data_version
+
+
+@st.cache_resource
+def get_report_jobs():
+    """Relatórios Excel gerados em segundo plano, compartilhados entre sessões"""
+    return ReportJobs()
+
+
+def build_excel_report(analytics: AgendorAnalytics) -> bytes:
+    """Relatório Excel completo em bytes (roda numa thread do ReportJobs)"""
+    return generate_excel_report(analytics).getvalue()
+
+
+def build_deals_export(analytics: AgendorAnalytics, fmt: str) -> bytes:
+    """Negócios filtrados em Parquet/Arrow/CSV (roda numa thread do ReportJobs)"""
+    buffer = BytesIO()
+    write_deals_export(analytics.df_deals, fmt, buffer)
+    return buffer.getvalue()
+
+
+@st.fragment(run_every=1)
+def render_report_progress(job_key):
+    """Acompanha o arquivo em geração sem bloquear o resto da página"""
+    job = get_report_jobs().get(job_key)
+    if job is None or job.done():
+        # redesenha a página inteira para mostrar o download
+        st.rerun()
+    
+    st.info("⏳ Gerando arquivo... o dashboard continua disponível enquanto isso.")
+
+
+def render_job_download(job_key, build, button_label: str, download_label: str,
+                        file_name: str, mime: str):
+    """
+    Botão que gera um arquivo em segundo plano, andamento e download
+    
+    O job_key identifica o arquivo: um já pronto para a mesma chave
+    (de qualquer sessão) é servido direto. Retorna True quando o
+    download está disponível.
+    """
+    jobs = get_report_jobs()
+    
+    job = jobs.get(job_key)
+    if job is not None and job.done() and job.exception() is not None:
+        st.error(f"❌ Erro ao gerar arquivo: {job.exception()}")
+        job = None
+    
+    if job is None:
+        if st.button(button_label, use_container_width=True, type="primary", key=f"gerar_{job_key[0]}"):
+            job = jobs.submit(job_key, build)
+    
+    if job is None:
+        return False
+    
+    if not job.done():
+        render_report_progress(job_key)
+        return False
+    
+    st.download_button(
+        label=download_label,
+        data=job.result(),
+        file_name=file_name,
+        mime=mime,
+        use_container_width=True,
+        key=f"baixar_{job_key[0]}"
+    )
+    return True
+
+
+def render_report_export(analytics: AgendorAnalytics, report_key):
+    """Relatório Excel gerencial dos dados filtrados"""
+    # Criar nome do arquivo com data
+    filename = f"relatorio_agendor_{datetime.now().strftime('%Y-%m-%d_%H%M')}.xlsx"
+    
+    ready = render_job_download(
+        ('excel',) + report_key,
+        lambda: build_excel_report(analytics),
+        "📊 Gerar Relatório Excel",
+        "⬇️ Baixar Relatório Excel",
+        filename,
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
     
-    return deals, users, funnels
+    if ready:
+        st.success("✅ Relatório gerado com sucesso!")
+        st.caption("O arquivo contém: KPIs, Vendedores, Top Clientes, Funil com gráficos")
+
+
+def render_deals_export(analytics: AgendorAnalytics, report_key):
+    """Negócios filtrados (dados brutos normalizados) para análise externa"""
+    fmt = st.selectbox("Formato dos dados:", list(EXPORT_FORMATS), key="formato_exportacao")
+    extension, mime = EXPORT_FORMATS[fmt]
+    filename = f"negocios_agendor_{datetime.now().strftime('%Y-%m-%d_%H%M')}{extension}"
+    
+    render_job_download(
+        ('deals', fmt) + report_key,
+        lambda: build_deals_export(analytics, fmt),
+        "🗂️ Exportar Negócios",
+        f"⬇️ Baixar Negócios ({fmt})",
+        filename,
+        mime
+    )
 
 
 def render_header():
@@ -265,6 +432,7 @@ def render_proposals_conversion(analytics: AgendorAnalytics):
                 delta=f"{won_deals:,} ganhos ({proposals_data['taxa_conversao']:.1f}%)"
             )
 
+@st.fragment
 def render_estimates(analytics: AgendorAnalytics):
     """Renderiza estimativas e previsões"""
     st.markdown("---")
@@ -444,6 +612,7 @@ def render_top_segments(analytics: AgendorAnalytics):
             st.markdown("")  # Espaçamento
 
 
+@st.fragment
 def render_conversion_funnel(analytics: AgendorAnalytics):
     """Renderiza análise de funil de conversão"""
     st.markdown("---")
@@ -804,10 +973,8 @@ def render_metas_progress(analytics: AgendorAnalytics):
     
     # Novos clientes (clientes únicos com primeiro negócio no período)
     # Simplificação: contar clientes únicos nos negócios ganhos
-    if not analytics.df_deals.empty and 'organization' in analytics.df_deals.columns:
-        novos_clientes = analytics.df_deals[analytics.df_deals['dealStatus'] == 'won']['organization'].apply(
-            lambda x: x.get('id') if isinstance(x, dict) else None
-        ).nunique()
+    if not analytics.df_deals.empty and 'organization_id' in analytics.df_deals.columns:
+        novos_clientes = analytics.df_deals[analytics.df_deals['dealStatus'] == 'won']['organization_id'].nunique()
     else:
         novos_clientes = 0
     
@@ -882,6 +1049,7 @@ def render_metas_progress(analytics: AgendorAnalytics):
         st.progress(min(progresso_clientes / 100, 1.0))
 
 
+@st.fragment
 def render_configuracoes_metas():
     """Renderiza aba de configuração de metas"""
     st.subheader("⚙️ Configuração de Metas")
@@ -975,6 +1143,120 @@ def render_configuracoes_metas():
             st.error("❌ Erro ao salvar metas. Tente novamente.")
 
 
+def render_tab_overview(analytics: AgendorAnalytics):
+    """Aba Visão Geral"""
+    render_kpis(analytics)
+    
+    st.markdown("---")
+    
+    # Insights e Alertas
+    st.subheader("💡 Insights & Alertas")
+    render_insights(analytics)
+    
+    st.markdown("---")
+    
+    # Conversão de propostas
+    render_proposals_conversion(analytics)
+    
+    st.markdown("---")
+    
+    # Top Customers e Segments lado a lado
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        render_top_customers(analytics)
+    
+    with col2:
+        render_top_segments(analytics)
+
+
+def render_tab_sellers(analytics: AgendorAnalytics):
+    """Aba Vendedores"""
+    render_seller_performance(analytics)
+    st.markdown("---")
+    render_estimates(analytics)
+
+
+def render_tab_advanced(analytics: AgendorAnalytics):
+    """Aba Análises Avançadas"""
+    render_revenue_analysis(analytics)
+    st.markdown("---")
+    render_time_analysis(analytics)
+    st.markdown("---")
+    render_loss_analysis(analytics)
+
+
+def render_tab_settings(analytics: AgendorAnalytics):
+    """Aba Configurações"""
+    render_configuracoes_metas()
+    
+    st.markdown("---")
+    st.markdown("---")
+    
+    st.markdown("## 📖 Sobre o Dashboard")
+    
+    st.markdown("""
+    Este dashboard foi desenvolvido para fornecer **insights gerenciais avançados** 
+    que não estão disponíveis diretamente no Agendor CRM.
+    """)
+    
+    st.markdown("### 🎯 Principais Métricas")
+    
+    st.markdown("**📊 Taxa de Conversão**")
+    st.caption("""
+    Percentual de negócios que avançam entre etapas do funil.
+    Serve para identificar gargalos no processo de vendas.
+    """)
+    
+    st.markdown("**💰 Receita Ponderada**")
+    st.caption("""
+    Receita ajustada pela probabilidade de fechamento baseada na etapa do funil.
+    Exemplo: Negócio de R$ 10.000 na etapa 2 de 4 = R$ 10.000 × (2/4) = R$ 5.000 ponderados
+    """)
+    
+    st.markdown("**📉 Valor Perdido**")
+    st.caption("""
+    Soma total do valor de todos os negócios perdidos.
+    Serve para identificar oportunidades perdidas e seu impacto financeiro.
+    """)
+    
+    st.markdown("**⏱️ Tempo Médio de Fechamento**")
+    st.caption("""
+    Número médio de dias entre a criação e o fechamento de um negócio.
+    Ajuda a entender a velocidade do ciclo de vendas.
+    """)
+    
+    st.markdown("**🎯 Propostas por Venda**")
+    st.caption("""
+    Quantas propostas são necessárias, em média, para fechar 1 venda.
+    Serve para dimensionar esforço comercial necessário para atingir metas.
+    """)
+    
+    st.markdown("---")
+    st.markdown("### 🔄 Atualização de Dados")
+    st.info("""
+    Os dados são atualizados em tempo real a partir da API do Agendor. 
+    Use o botão "🔄 Atualizar Dados" na barra lateral para forçar uma nova consulta.
+    """)
+    
+    st.markdown("---")
+    st.markdown("### 👨‍💻 Suporte")
+    st.markdown("""
+    Em caso de dúvidas ou sugestões de melhorias, entre em contato com o time de TI.
+    """)
+
+
+# Abas do dashboard: só a aba selecionada é renderizada (e calcula suas métricas)
+TABS = {
+    "📊 Visão Geral": render_tab_overview,
+    "🎯 Metas & Objetivos": render_metas_progress,
+    "📈 Funil & Conversão": render_conversion_funnel,
+    "👥 Vendedores": render_tab_sellers,
+    "🔬 Análises Avançadas": render_tab_advanced,
+    "⚙️ Configurações": render_tab_settings,
+}
+
+
 def main():
     """Função principal do dashboard"""
     
@@ -982,29 +1264,18 @@ def main():
     render_header()
     
     # Carregar dados
-    deals, users, funnels = load_data()
+    dataset = load_data()
     
-    if deals is None:
+    if dataset is None:
         st.stop()
     
-    if not deals:
+    if not dataset.deals:
         st.warning("⚠️ Nenhum negócio encontrado no Agendor.")
         st.stop()
     
-    # Criar DataFrame inicial
-    df_deals = pd.DataFrame(deals)
-    
-    # Processar datas para filtros
-    if 'wonAt' in df_deals.columns:
-        df_deals['wonAt'] = pd.to_datetime(df_deals['wonAt'])
-    if 'lostAt' in df_deals.columns:
-        df_deals['lostAt'] = pd.to_datetime(df_deals['lostAt'])
-    if 'createdAt' in df_deals.columns:
-        df_deals['createdAt'] = pd.to_datetime(df_deals['createdAt'])
-    
-    # Extrair owner para filtro
-    if 'owner' in df_deals.columns:
-        df_deals['owner_name'] = df_deals['owner'].apply(lambda x: x.get('name') if isinstance(x, dict) else 'Sem vendedor')
+    # Frame com datas e vendedor já extraídos, base de todos os filtros
+    # (somente leitura: o mesmo objeto atende todas as sessões)
+    df_deals = dataset.df_deals
     
     # Sidebar com filtros
     with st.sidebar:
@@ -1026,7 +1297,7 @@ def main():
         # Filtro de período
         date_filter = st.radio(
             "Selecione o período:",
-            ["Todos os dados", "Último mês", "Últimos 3 meses", "Últimos 6 meses", "Último ano", "Personalizado"],
+            PERIOD_OPTIONS,
             index=0
         )
         
@@ -1034,7 +1305,7 @@ def main():
         start_date = None
         end_date = None
         
-        if date_filter == "Personalizado":
+        if date_filter == CUSTOM_PERIOD:
             col1, col2 = st.columns(2)
             with col1:
                 start_date = st.date_input("Data inicial", value=pd.Timestamp.now() - pd.Timedelta(days=365))
@@ -1045,218 +1316,60 @@ def main():
         st.subheader("👤 Filtro de Vendedor")
         
         # Lista de vendedores únicos
-        all_sellers = sorted(df_deals['owner_name'].dropna().unique().tolist())
+        all_sellers = sorted(df_deals['user_name'].dropna().unique().tolist())
         seller_filter = st.multiselect(
             "Selecione vendedor(es):",
-            options=["Todos"] + all_sellers,
-            default=["Todos"]
+            options=[ALL_SELLERS] + all_sellers,
+            default=[ALL_SELLERS]
         )
         
         st.markdown("---")
         
-        # Aplicar filtros
-        filtered_deals = deals.copy()
-        
-        # Filtro de data
-        if date_filter != "Todos os dados":
-            now = pd.Timestamp.now()
-            
-            if date_filter == "Último mês":
-                date_limit = now - pd.Timedelta(days=30)
-            elif date_filter == "Últimos 3 meses":
-                date_limit = now - pd.Timedelta(days=90)
-            elif date_filter == "Últimos 6 meses":
-                date_limit = now - pd.Timedelta(days=180)
-            elif date_filter == "Último ano":
-                date_limit = now - pd.Timedelta(days=365)
-            elif date_filter == "Personalizado":
-                date_limit = pd.Timestamp(start_date)
-                end_limit = pd.Timestamp(end_date)
-            
-            # Filtrar deals pela data de término (endTime) - IGUAL AO AGENDOR
-            filtered_deals = []
-            for deal in deals:
-                # Usar endTime se disponível, senão usar wonAt ou lostAt
-                end_date = None
-                if deal.get('endTime'):
-                    end_date = pd.Timestamp(deal['endTime'])
-                elif deal.get('wonAt'):
-                    end_date = pd.Timestamp(deal['wonAt'])
-                elif deal.get('lostAt'):
-                    end_date = pd.Timestamp(deal['lostAt'])
-                
-                if end_date:
-                    # Converter para timestamp sem timezone para comparação consistente
-                    if end_date.tz is not None:
-                        end_date = end_date.tz_localize(None)
-                    
-                    if date_filter == "Personalizado":
-                        if date_limit <= end_date <= end_limit:
-                            filtered_deals.append(deal)
-                    else:
-                        if end_date >= date_limit:
-                            filtered_deals.append(deal)
-        
-        # Filtro de vendedor
-        if "Todos" not in seller_filter and seller_filter:
-            filtered_deals = [
-                deal for deal in filtered_deals 
-                if deal.get('owner') and isinstance(deal.get('owner'), dict) and deal.get('owner', {}).get('name') in seller_filter
-            ]
+        # Aplicar filtros (data de término igual ao Agendor, e vendedor)
+        signature = filter_signature(date_filter, start_date, end_date, seller_filter)
+        drop_stale_analytics(dataset.version)
+        analytics = get_analytics(df_deals, dataset.users, dataset.funnels, dataset.version, signature)
         
         # Mostrar estatísticas dos filtros
-        st.info(f"📊 **{len(filtered_deals)}** negócios filtrados de **{len(deals)}** totais")
+        st.info(f"📊 **{len(analytics.df_deals)}** negócios filtrados de **{len(df_deals)}** totais")
         
         st.markdown("---")
         
         # Botão de exportar para Excel
         st.subheader("📥 Exportar Relatório")
         
-        if st.button("📊 Gerar Relatório Excel", use_container_width=True, type="primary"):
-            with st.spinner("Gerando relatório Excel..."):
-                # Criar analytics temporário para gerar o relatório
-                temp_analytics = AgendorAnalytics(filtered_deals, users, funnels)
-                excel_buffer = generate_excel_report(temp_analytics)
-                
-                # Criar nome do arquivo com data
-                filename = f"relatorio_agendor_{datetime.now().strftime('%Y-%m-%d_%H%M')}.xlsx"
-                
-                st.download_button(
-                    label="⬇️ Baixar Relatório Excel",
-                    data=excel_buffer,
-                    file_name=filename,
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    use_container_width=True
-                )
-                
-                st.success("✅ Relatório gerado com sucesso!")
-                st.caption("O arquivo contém: KPIs, Vendedores, Top Clientes, Funil com gráficos")
+        render_report_export(analytics, (dataset.version, signature))
+        
+        st.caption("Dados dos negócios filtrados, uma linha por negócio")
+        render_deals_export(analytics, (dataset.version, signature))
         
         st.markdown("---")
         
         if st.button("🔄 Atualizar Dados", use_container_width=True):
-            st.cache_data.clear()
-            st.rerun()
-    
-    # Criar objeto de analytics com dados filtrados
-    analytics = AgendorAnalytics(filtered_deals, users, funnels)
+            # só o que mudou desde a última sincronização, no worker; os
+            # dados novos aparecem no próximo rerun
+            get_shared_dataset().request_refresh()
+            st.info("🔄 Atualização iniciada. Os dados novos aparecem na próxima interação.")
+        
+        # o download completo já roda sozinho a cada FULL_SYNC_INTERVAL;
+        # o botão é para quando um negócio excluído no Agendor não pode esperar
+        if st.button("♻️ Recarregar tudo do Agendor", use_container_width=True,
+                     help="Baixa todos os negócios de novo e remove os excluídos no Agendor (mais lento)"):
+            get_shared_dataset().request_refresh(full=True)
+            st.info("♻️ Download completo iniciado. Os dados novos aparecem na próxima interação.")
     
     # ===== NAVEGAÇÃO POR ABAS =====
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-        "📊 Visão Geral",
-        "🎯 Metas & Objetivos",
-        "📈 Funil & Conversão",
-        "👥 Vendedores",
-        "� Análises Avançadas",
-        "⚙️ Configurações"
-    ])
-    
-    # === ABA 1: VISÃO GERAL ===
-    with tab1:
-        render_kpis(analytics)
-        
-        st.markdown("---")
-        
-        # Insights e Alertas
-        st.subheader("💡 Insights & Alertas")
-        render_insights(analytics)
-        
-        st.markdown("---")
-        
-        # Conversão de propostas
-        render_proposals_conversion(analytics)
-        
-        st.markdown("---")
-        
-        # Top Customers e Segments lado a lado
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            render_top_customers(analytics)
-        
-        with col2:
-            render_top_segments(analytics)
-    
-    # === ABA 2: METAS & OBJETIVOS ===
-    with tab2:
-        render_metas_progress(analytics)
-    
-    # === ABA 3: FUNIL & CONVERSÃO ===
-    with tab3:
-        render_conversion_funnel(analytics)
-    
-    # === ABA 4: VENDEDORES ===
-    with tab4:
-        render_seller_performance(analytics)
-        st.markdown("---")
-        render_estimates(analytics)
-    
-    # === ABA 5: ANÁLISES AVANÇADAS ===
-    with tab5:
-        render_revenue_analysis(analytics)
-        st.markdown("---")
-        render_time_analysis(analytics)
-        st.markdown("---")
-        render_loss_analysis(analytics)
+    # st.tabs executaria todas as abas a cada rerun; com o seletor, só a
+    # aba visível calcula métricas e monta gráficos
+    selected_tab = st.radio(
+        "Navegação",
+        list(TABS),
+        horizontal=True,
+        key="active_tab",
+        label_visibility="collapsed"
+    )
     
-    # === ABA 6: CONFIGURAÇÕES ===
-    with tab6:
-        render_configuracoes_metas()
-        
-        st.markdown("---")
-        st.markdown("---")
-        
-        st.markdown("## 📖 Sobre o Dashboard")
-        
-        st.markdown("""
-        Este dashboard foi desenvolvido para fornecer **insights gerenciais avançados** 
-        que não estão disponíveis diretamente no Agendor CRM.
-        """)
-        
-        st.markdown("### 🎯 Principais Métricas")
-        
-        st.markdown("**📊 Taxa de Conversão**")
-        st.caption("""
-        Percentual de negócios que avançam entre etapas do funil.
-        Serve para identificar gargalos no processo de vendas.
-        """)
-        
-        st.markdown("**💰 Receita Ponderada**")
-        st.caption("""
-        Receita ajustada pela probabilidade de fechamento baseada na etapa do funil.
-        Exemplo: Negócio de R$ 10.000 na etapa 2 de 4 = R$ 10.000 × (2/4) = R$ 5.000 ponderados
-        """)
-        
-        st.markdown("**📉 Valor Perdido**")
-        st.caption("""
-        Soma total do valor de todos os negócios perdidos.
-        Serve para identificar oportunidades perdidas e seu impacto financeiro.
-        """)
-        
-        st.markdown("**⏱️ Tempo Médio de Fechamento**")
-        st.caption("""
-        Número médio de dias entre a criação e o fechamento de um negócio.
-        Ajuda a entender a velocidade do ciclo de vendas.
-        """)
-        
-        st.markdown("**🎯 Propostas por Venda**")
-        st.caption("""
-        Quantas propostas são necessárias, em média, para fechar 1 venda.
-        Serve para dimensionar esforço comercial necessário para atingir metas.
-        """)
-        
-        st.markdown("---")
-        st.markdown("### 🔄 Atualização de Dados")
-        st.info("""
-        Os dados são atualizados em tempo real a partir da API do Agendor. 
-        Use o botão "🔄 Atualizar Dados" na barra lateral para forçar uma nova consulta.
-        """)
-        
-        st.markdown("---")
-        st.markdown("### 👨‍💻 Suporte")
-        st.markdown("""
-        Em caso de dúvidas ou sugestões de melhorias, entre em contato com o time de TI.
-        """)
+    TABS[selected_tab](analytics)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,85 @@
+"""
+Exportação dos negócios (frame normalizado) em formatos colunares
+Parquet e Arrow (via pyarrow) e CSV escrito em blocos, para análises
+fora do dashboard sem baixar a API de novo
+"""
+
+from typing import BinaryIO, Dict, List
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+# formato -> (extensão, MIME type)
+EXPORT_FORMATS: Dict[str, tuple] = {
+    'CSV': ('.csv', 'text/csv'),
+}
+if pa is not None:
+    EXPORT_FORMATS['Parquet'] = ('.parquet', 'application/vnd.apache.parquet')
+    EXPORT_FORMATS['Arrow'] = ('.arrow', 'application/vnd.apache.arrow.file')
+
+# linhas por bloco no CSV: limita o texto montado de uma vez na memória
+CSV_CHUNK_ROWS = 50000
+
+
+def flat_columns(df: pd.DataFrame) -> List[str]:
+    """
+    Colunas escalares do frame (descarta campos aninhados da API)
+
+    Colunas object com dict/list (ex.: customFields, products) não têm
+    representação colunar direta e ficam de fora da exportação.
+    """
+    columns = []
+    for name in df.columns:
+        values = df[name]
+        if values.dtype == object:
+            sample = values.dropna()
+            if len(sample) and isinstance(sample.iloc[0], (dict, list)):
+                continue
+        columns.append(name)
+    return columns
+
+
+def prepare_export_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Frame exportado: só colunas escalares, sem o índice do filtro"""
+    return df[flat_columns(df)].reset_index(drop=True)
+
+
+def write_csv(df: pd.DataFrame, target: BinaryIO, chunk_rows: int = CSV_CHUNK_ROWS) -> None:
+    """CSV em UTF-8 com BOM (abre direto no Excel), escrito em blocos de linhas"""
+    target.write('\ufeff'.encode('utf-8'))
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        target.write(chunk.to_csv(index=False, header=start == 0).encode('utf-8'))
+
+
+def write_deals_export(df: pd.DataFrame, fmt: str, target: BinaryIO) -> None:
+    """
+    Escreve os negócios no formato pedido (uma das EXPORT_FORMATS)
+
+    Args:
+        df: frame de negócios (ex.: AgendorAnalytics.df_deals, já filtrado)
+        fmt: 'CSV', 'Parquet' ou 'Arrow'
+        target: arquivo binário aberto (ou BytesIO)
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Formato não suportado: {fmt} (instale pyarrow para Parquet/Arrow)")
+
+    df = prepare_export_frame(df)
+
+    if fmt == 'CSV':
+        write_csv(df, target)
+        return
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if fmt == 'Parquet':
+        pq.write_table(table, target, compression='zstd')
+    else:
+        with pa.ipc.new_file(target, table.schema) as writer:
+            writer.write_table(table)
@@ -0,0 +1,89 @@
+"""
+Filtros do dashboard aplicados sobre o DataFrame de negócios
+Usa máscaras booleanas sobre colunas já convertidas (ver build_deals_dataframe)
+"""
+
+from datetime import date
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+ALL_PERIODS = "Todos os dados"
+CUSTOM_PERIOD = "Personalizado"
+ALL_SELLERS = "Todos"
+
+# períodos pré-definidos -> dias para trás a partir de agora
+PERIOD_PRESETS = {
+    "Último mês": 30,
+    "Últimos 3 meses": 90,
+    "Últimos 6 meses": 180,
+    "Último ano": 365,
+}
+
+PERIOD_OPTIONS = [ALL_PERIODS, *PERIOD_PRESETS, CUSTOM_PERIOD]
+
+
+def filter_deals(df: pd.DataFrame, period: str = ALL_PERIODS, start_date=None, end_date=None,
+                 sellers: Optional[List[str]] = None, now: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """
+    Filtra negócios por período (data de término) e vendedor
+
+    Args:
+        df: frame de build_deals_dataframe (precisa de endDate e user_name)
+        period: uma das PERIOD_OPTIONS
+        start_date, end_date: limites do período personalizado
+        sellers: nomes de vendedores; vazio ou contendo "Todos" não filtra
+        now: referência dos períodos pré-definidos (padrão: agora)
+
+    Returns:
+        DataFrame com os negócios selecionados, pronto para AgendorAnalytics;
+        sem nenhum filtro efetivo é o próprio df (sem cópia), que continua
+        somente leitura
+    """
+    if df.empty:
+        return df.copy()
+
+    mask = np.ones(len(df), dtype=bool)
+
+    # negócios sem data de término ficam fora de qualquer período
+    if period != ALL_PERIODS:
+        end = df['endDate']
+        if period == CUSTOM_PERIOD:
+            mask &= ((end >= pd.Timestamp(start_date)) & (end <= pd.Timestamp(end_date))).to_numpy()
+        else:
+            now = now if now is not None else pd.Timestamp.now()
+            mask &= (end >= now - pd.Timedelta(days=PERIOD_PRESETS[period])).to_numpy()
+
+    if sellers and ALL_SELLERS not in sellers:
+        mask &= df['user_name'].isin(sellers).to_numpy()
+
+    if mask.all():
+        return df
+    return df[mask]
+
+
+def filter_signature(period: str = ALL_PERIODS, start_date=None, end_date=None,
+                     sellers: Optional[List[str]] = None, today: Optional[date] = None) -> Tuple:
+    """
+    Chave normalizada dos filtros, para reaproveitar resultados em cache
+
+    Seleções equivalentes geram a mesma chave: datas só contam no período
+    personalizado, a ordem dos vendedores não importa e "Todos" equivale a
+    nenhum filtro. Períodos pré-definidos incluem o dia de referência, já
+    que a janela anda com o tempo.
+    """
+    if period == CUSTOM_PERIOD:
+        dates = (pd.Timestamp(start_date), pd.Timestamp(end_date))
+    elif period in PERIOD_PRESETS:
+        dates = (today or date.today(),)
+    else:
+        dates = ()
+
+    if not sellers or ALL_SELLERS in sellers:
+        seller_key = ()
+    else:
+        seller_key = tuple(sorted(set(sellers)))
+
+    return (period, dates, seller_key)
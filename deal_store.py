@@ -0,0 +1,204 @@
+"""
+Armazenamento local (SQLite) dos dados do Agendor
+Compartilhado entre o dashboard e os scripts de análise para evitar
+baixar a conta inteira a cada execução
+"""
+
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from config import LOCAL_STORE_PATH
+from deal_sync import DealSnapshot, parse_api_datetime
+
+
+class DealStore:
+    """
+    Guarda negócios, usuários e funis em um arquivo SQLite
+
+    Cada coleção tem seus registros (JSON bruto da API, indexado por id) e
+    uma linha de metadados com o horário da última sincronização, o do
+    último download completo e, para negócios, a marca d'água do updatedAt.
+    """
+
+    def __init__(self, path: str = LOCAL_STORE_PATH):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS records (
+                    collection TEXT NOT NULL,
+                    id INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (collection, id)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    collection TEXT PRIMARY KEY,
+                    synced_at REAL NOT NULL,
+                    high_water_mark TEXT,
+                    full_synced_at REAL
+                )
+            """)
+            # arquivos criados antes da coluna full_synced_at
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(sync_state)")}
+            if 'full_synced_at' not in columns:
+                conn.execute("ALTER TABLE sync_state ADD COLUMN full_synced_at REAL")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # uma conexão por operação: o store é usado por várias threads;
+        # commit no fim (rollback em erro) e a conexão sempre é fechada
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def load(self, collection: str) -> List[Dict]:
+        """Retorna todos os registros de uma coleção"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT data FROM records WHERE collection = ? ORDER BY rowid",
+                (collection,)
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def get_many(self, collection: str, ids: Iterable[int]) -> Dict[int, Dict]:
+        """Registros pelos ids (pela chave primária, sem ler a coleção inteira)"""
+        ids = list(dict.fromkeys(ids))
+        found = {}
+        with self._connect() as conn:
+            # em lotes, abaixo do limite de parâmetros do SQLite
+            for start in range(0, len(ids), 500):
+                batch = ids[start:start + 500]
+                placeholders = ','.join('?' * len(batch))
+                rows = conn.execute(
+                    f"SELECT id, data FROM records WHERE collection = ? AND id IN ({placeholders})",
+                    (collection, *batch)
+                ).fetchall()
+                found.update((row_id, json.loads(data)) for row_id, data in rows)
+        return found
+
+    def save(self, collection: str, rows: List[Dict], replace: bool = True,
+             high_water_mark: Optional[str] = None) -> None:
+        """
+        Grava registros de uma coleção e marca o horário da sincronização
+
+        Args:
+            collection: nome da coleção ('deals', 'users', 'funnels')
+            rows: registros da API (precisam ter 'id')
+            replace: apaga os registros anteriores (download completo);
+                     se False, faz upsert por id (sincronização incremental)
+            high_water_mark: maior updatedAt recebido, quando aplicável
+        """
+        with self._connect() as conn:
+            if replace:
+                conn.execute("DELETE FROM records WHERE collection = ?", (collection,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO records (collection, id, data) VALUES (?, ?, ?)",
+                [(collection, row['id'], json.dumps(row, ensure_ascii=False))
+                 for row in rows if row.get('id') is not None]
+            )
+            self._write_sync_state(conn, collection, high_water_mark, full=replace)
+
+    def save_pages(self, collection: str, pages: Iterable[List[Dict]], replace: bool = True) -> int:
+        """
+        Grava registros página a página (ex.: AgendorClient.iter_pages())
+
+        Só uma página fica serializada na memória por vez; a marca d'água do
+        updatedAt é calculada durante a gravação (com replace=False, nunca
+        recua em relação à gravada). Retorna o total de registros gravados.
+        """
+        total = 0
+        high_water_mark = None
+        hwm = None
+
+        with self._connect() as conn:
+            if replace:
+                conn.execute("DELETE FROM records WHERE collection = ?", (collection,))
+
+            for page in pages:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO records (collection, id, data) VALUES (?, ?, ?)",
+                    [(collection, row['id'], json.dumps(row, ensure_ascii=False))
+                     for row in page if row.get('id') is not None]
+                )
+                total += len(page)
+
+                for row in page:
+                    updated = parse_api_datetime(row.get('updatedAt'))
+                    if updated and (hwm is None or updated > hwm):
+                        hwm = updated
+                        high_water_mark = row['updatedAt']
+
+            if not replace:
+                # upsert parcial: a marca d'água gravada vale para os registros
+                # que já estavam no disco
+                row = conn.execute(
+                    "SELECT high_water_mark FROM sync_state WHERE collection = ?", (collection,)
+                ).fetchone()
+                stored = row[0] if row else None
+                stored_hwm = parse_api_datetime(stored)
+                if stored_hwm is not None and (hwm is None or stored_hwm > hwm):
+                    high_water_mark = stored
+
+            self._write_sync_state(conn, collection, high_water_mark, full=replace)
+
+        return total
+
+    @staticmethod
+    def _write_sync_state(conn: sqlite3.Connection, collection: str,
+                          high_water_mark: Optional[str], full: bool) -> None:
+        # full: os registros gravados são um download completo; numa gravação
+        # incremental o horário do último download completo é mantido
+        now = time.time()
+        conn.execute(
+            """
+            INSERT INTO sync_state (collection, synced_at, high_water_mark, full_synced_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (collection) DO UPDATE SET
+                synced_at = excluded.synced_at,
+                high_water_mark = excluded.high_water_mark,
+                full_synced_at = COALESCE(excluded.full_synced_at, sync_state.full_synced_at)
+            """,
+            (collection, now, high_water_mark, now if full else None)
+        )
+
+    def touch(self, collection: str) -> None:
+        """Marca a coleção como sincronizada agora, sem alterar registros"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE sync_state SET synced_at = ? WHERE collection = ?",
+                (time.time(), collection)
+            )
+
+    def get_sync_state(self, collection: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT synced_at, high_water_mark, full_synced_at FROM sync_state WHERE collection = ?",
+                (collection,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'synced_at': row[0], 'high_water_mark': row[1], 'full_synced_at': row[2]}
+
+    def is_fresh(self, collection: str, max_age: float) -> bool:
+        """True se a coleção foi sincronizada há menos de max_age segundos"""
+        state = self.get_sync_state(collection)
+        return state is not None and time.time() - state['synced_at'] < max_age
+
+    def load_snapshot(self) -> DealSnapshot:
+        """Reconstrói o snapshot de negócios salvo no disco"""
+        state = self.get_sync_state('deals')
+        snapshot = DealSnapshot(self.load('deals'))
+        if state:
+            if state['high_water_mark']:
+                snapshot.high_water_mark = state['high_water_mark']
+            # sem registro (arquivo antigo): o próximo sync é completo
+            snapshot.full_synced_at = state['full_synced_at']
+        return snapshot
@@ -0,0 +1,137 @@
+"""
+Sincronização incremental de negócios do Agendor
+Mantém um snapshot local da lista de negócios e busca na API apenas
+o que foi alterado desde a última sincronização
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+
+# Margem de segurança ao consultar a API: negócios alterados no mesmo
+# instante da marca d'água não se perdem (o merge por id é idempotente)
+SYNC_OVERLAP = timedelta(minutes=1)
+
+
+def parse_api_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Converte datas ISO 8601 da API (inclusive com sufixo Z) em datetime"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+class DealSnapshot:
+    """
+    Snapshot local dos negócios indexado por id
+
+    A marca d'água (high_water_mark) é o maior updatedAt já recebido,
+    usando o relógio do servidor em vez do local. full_synced_at é o
+    horário (local) do último download completo.
+    """
+
+    def __init__(self, deals: Optional[List[Dict]] = None, high_water_mark: Optional[str] = None,
+                 full_synced_at: Optional[float] = None):
+        self._deals: Dict[int, Dict] = {}
+        self._lock = threading.Lock()
+        # evita dois downloads simultâneos do mesmo snapshot
+        self._sync_lock = threading.Lock()
+        self.high_water_mark = high_water_mark
+        self.full_synced_at = full_synced_at
+        self.version = 0
+
+        if deals:
+            self._merge(deals)
+
+    def __len__(self) -> int:
+        return len(self._deals)
+
+    @property
+    def deals(self) -> List[Dict]:
+        return list(self._deals.values())
+
+    def get(self, deal_id: int) -> Optional[Dict]:
+        """Negócio pelo id, se estiver no snapshot"""
+        return self._deals.get(deal_id)
+
+    def _merge(self, deals: List[Dict], previous: Optional[Dict[int, Dict]] = None) -> List[Dict]:
+        # aplica negócios novos/alterados e avança a marca d'água; a versão
+        # só muda se algum negócio é novo ou mudou de updatedAt (a margem
+        # SYNC_OVERLAP reenvia negócios já conhecidos a cada sync).
+        # previous: índice anterior a um download completo, para comparar
+        previous = self._deals if previous is None else previous
+        hwm = parse_api_datetime(self.high_water_mark)
+        changed = False
+
+        for deal in deals:
+            deal_id = deal.get('id')
+            if deal_id is None:
+                continue
+            known = previous.get(deal_id)
+            if known is None or known.get('updatedAt') != deal.get('updatedAt'):
+                changed = True
+            self._deals[deal_id] = deal
+
+            updated = parse_api_datetime(deal.get('updatedAt'))
+            if updated and (hwm is None or updated > hwm):
+                hwm = updated
+                self.high_water_mark = deal['updatedAt']
+
+        # download completo sem algum negócio anterior: foi excluído
+        if previous is not self._deals and len(previous) != len(self._deals):
+            changed = True
+
+        if changed:
+            self.version += 1
+
+        return deals
+
+    def next_since(self) -> Optional[str]:
+        """
+        Parâmetro updatedDateGt da próxima sincronização incremental
+
+        Retorna None quando é preciso um download completo (snapshot vazio).
+        """
+        hwm = parse_api_datetime(self.high_water_mark)
+        if hwm is None or not self._deals:
+            return None
+        return (hwm - SYNC_OVERLAP).isoformat()
+
+    def full_sync_due(self, interval: float) -> bool:
+        """True se o último download completo tem mais de `interval` segundos (ou nunca houve)"""
+        return self.full_synced_at is None or time.time() - self.full_synced_at >= interval
+
+    def apply(self, deals: List[Dict], full: bool) -> List[Dict]:
+        """Aplica o resultado de um download completo ou incremental"""
+        with self._lock:
+            if full and deals:
+                previous = self._deals
+                self._deals = {}
+                self.high_water_mark = None
+                self.full_synced_at = time.time()
+                return self._merge(deals, previous)
+            return self._merge(deals)
+
+    def sync(self, client, full: bool = False) -> List[Dict]:
+        """
+        Atualiza o snapshot a partir da API
+
+        Args:
+            client: AgendorClient usado para as consultas
+            full: força o download completo (também usado no primeiro sync)
+
+        Returns:
+            Negócios recebidos da API nesta sincronização
+
+        Negócios excluídos no Agendor só saem do snapshot num sync completo.
+        """
+        with self._sync_lock:
+            since = None if full else self.next_since()
+
+            if since is None:
+                return self.apply(client.fetch_deals(), full=True)
+            return self.apply(client.get_deals_updated_since(since), full=False)
@@ -4,6 +4,7 @@ Debug: Ver quais clientes estão sendo classificados como "Outros"
 
 from agendor_client import AgendorClient
 from analytics import AgendorAnalytics
+from segments import classify_segments
 import pandas as pd
 
 client = AgendorClient()
@@ -21,46 +22,18 @@ won_deals = analytics.df_deals[analytics.df_deals['dealStatus'] == 'won'].copy()
 if won_deals.empty:
     print("Sem negócios ganhos")
 else:
-    # Extrair nome da organização
-    won_deals['customer_name'] = won_deals['organization'].apply(
-        lambda x: x.get('name', '') if isinstance(x, dict) else ''
-    )
+    # Nome da organização
+    won_deals['customer_name'] = won_deals['organization_name'].astype(object).fillna('')
     
-    # Usar a mesma função de identificação
-    def identify_segment(name):
-        name_lower = str(name).lower()
-        
-        if any(word in name_lower for word in ['miner', 'mineração', 'mineracao', 'minera']):
-            return 'Mineração'
-        elif any(word in name_lower for word in ['constru', 'obras', 'engenharia']):
-            return 'Construção/Engenharia'
-        elif any(word in name_lower for word in ['cimento', 'concreto']):
-            return 'Cimento/Concreto'
-        elif any(word in name_lower for word in ['industria', 'indústria', 'fabrica', 'fábrica']):
-            return 'Indústria'
-        elif any(word in name_lower for word in ['energia', 'eletric', 'hidrel']):
-            return 'Energia'
-        elif any(word in name_lower for word in ['metal', 'siderur', 'aço', 'aco']):
-            return 'Metalurgia/Siderurgia'
-        elif any(word in name_lower for word in ['agricola', 'agrícola', 'agro']):
-            return 'Agronegócio'
-        elif any(word in name_lower for word in ['quimic', 'química']):
-            return 'Química'
-        elif any(word in name_lower for word in ['transport', 'logistic']):
-            return 'Transporte/Logística'
-        elif any(word in name_lower for word in ['prefeitura', 'governo', 'municipal']):
-            return 'Setor Público'
-        else:
-            return 'Outros'
-    
-    won_deals['segmento'] = won_deals['customer_name'].apply(identify_segment)
+    # Mesma classificação usada pelo dashboard
+    won_deals['segmento'] = classify_segments(won_deals['customer_name'])
     
     # Resumo por segmento
     print("\n" + "="*80)
     print("RESUMO POR SEGMENTO:")
     print("="*80)
     
-    segment_summary = won_deals.groupby('segmento').agg({
+    segment_summary = won_deals.groupby('segmento', observed=True).agg({
         'value': ['sum', 'count'],
         'customer_name': 'nunique'
     })
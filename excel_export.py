@@ -1,58 +1,174 @@
 """
 Módulo para exportação de relatórios em Excel
 Gera arquivos Excel formatados com múltiplas abas e gráficos
+
+As abas são escritas em modo write-only (streaming): as linhas vão direto
+para o arquivo, com estilos criados uma única vez e larguras de coluna
+calculadas antes da escrita, então o custo cresce só com o número de linhas.
 """
 
 import pandas as pd
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.utils import get_column_letter
 from openpyxl.chart import BarChart, PieChart, LineChart, Reference
 from io import BytesIO
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence, Tuple
 from analytics import AgendorAnalytics
 
 
-def apply_header_style(ws, max_col):
-    """Aplica estilo ao cabeçalho (primeira linha)"""
-    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF", size=11)
+# Estilos compartilhados por todas as células (criados uma vez só)
+HEADER_FILL = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+HEADER_FONT = Font(bold=True, color="FFFFFF", size=11)
+HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center")
+LEFT_ALIGNMENT = Alignment(horizontal="left", vertical="center")
+THIN_SIDE = Side(style='thin', color='000000')
+THIN_BORDER = Border(left=THIN_SIDE, right=THIN_SIDE, top=THIN_SIDE, bottom=THIN_SIDE)
+GREEN_FILL = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+RED_FILL = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+TITLE_FONT = Font(bold=True, size=20)
+SECTION_FONT = Font(bold=True, size=12)
+SECTION_HEADER_FONT = Font(bold=True, color="FFFFFF")
+
+MONEY_FORMAT = 'R$ #,##0.00'
+PERCENT_FORMAT = '0.00"%"'
+
+MAX_COLUMN_WIDTH = 50
+
+
+def column_widths(rows: Sequence[Sequence], max_col: int) -> List[int]:
+    """Largura de cada coluna pelo maior texto (mesma regra do ajuste automático)"""
+    lengths = [0] * max_col
+    for row in rows:
+        for col, value in enumerate(row[:max_col]):
+            if value:
+                lengths[col] = max(lengths[col], len(str(value)))
+    return [min(length + 2, MAX_COLUMN_WIDTH) for length in lengths]
+
+
+def frame_column_widths(df: pd.DataFrame) -> List[int]:
+    """column_widths para um DataFrame, calculado por coluna (sem iterar células)"""
+    widths = []
+    for name in df.columns:
+        values = df[name]
+        values = values[values.notna()].astype(str)
+        values = values[~values.isin(['', '0', '0.0', 'False'])]
+        longest = int(values.str.len().max()) if len(values) else 0
+        widths.append(min(max(longest, len(str(name))) + 2, MAX_COLUMN_WIDTH))
+    return widths
+
+
+def set_column_widths(ws, widths: Sequence[int]) -> None:
+    # em modo write-only as larguras precisam ser definidas antes da primeira linha
+    for col, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(col)].width = width
+
+
+def styled_cell(ws, value, font=None, fill=None, border=None, alignment=None,
+                number_format=None, style=None) -> WriteOnlyCell:
+    """
+    Célula write-only com os estilos (compartilhados) informados
     
-    for col in range(1, max_col + 1):
-        cell = ws.cell(row=1, column=col)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center", vertical="center")
+    style (nome vindo de cell_style) aplica um estilo nomeado já registrado
+    no workbook: atribuir Font/Border célula a célula faz o openpyxl
+    procurá-los de novo na tabela de estilos a cada vez.
+    """
+    cell = WriteOnlyCell(ws, value=value)
+    if style is not None:
+        cell.style = style
+        return cell
+    if font is not None:
+        cell.font = font
+    if fill is not None:
+        cell.fill = fill
+    if border is not None:
+        cell.border = border
+    if alignment is not None:
+        cell.alignment = alignment
+    if number_format is not None:
+        cell.number_format = number_format
+    return cell
 
 
-def apply_borders(ws, max_row, max_col):
-    """Aplica bordas a todas as células"""
-    thin_border = Border(
-        left=Side(style='thin', color='000000'),
-        right=Side(style='thin', color='000000'),
-        top=Side(style='thin', color='000000'),
-        bottom=Side(style='thin', color='000000')
-    )
+def cell_style(ws, font=None, fill=None, border=None, alignment=None, number_format=None) -> str:
+    """
+    Registra um estilo nomeado no workbook da aba, para
+    styled_cell(..., style=...) em muitas células
     
-    for row in range(1, max_row + 1):
-        for col in range(1, max_col + 1):
-            ws.cell(row=row, column=col).border = thin_border
+    Returns:
+        Nome do estilo registrado
+    """
+    wb = ws.parent
+    # sem fonte própria fica a padrão do workbook, como nas demais células
+    style = NamedStyle(name=f"Tabela {len(wb.named_styles)}", font=font or DEFAULT_FONT)
+    if fill is not None:
+        style.fill = fill
+    if border is not None:
+        style.border = border
+    if alignment is not None:
+        style.alignment = alignment
+    if number_format is not None:
+        style.number_format = number_format
+    wb.add_named_style(style)
+    return style.name
 
 
-def auto_adjust_columns(ws, max_col):
-    """Ajusta largura das colunas automaticamente"""
-    for col in range(1, max_col + 1):
-        max_length = 0
-        column_letter = ws.cell(row=1, column=col).column_letter
-        
-        for row in range(1, ws.max_row + 1):
-            cell = ws.cell(row=row, column=col)
-            if cell.value:
-                max_length = max(max_length, len(str(cell.value)))
-        
-        adjusted_width = min(max_length + 2, 50)
-        ws.column_dimensions[column_letter].width = adjusted_width
+def write_table(ws, df: pd.DataFrame, number_formats: Optional[Dict[str, str]] = None,
+                alignment: Optional[Alignment] = None,
+                fills: Optional[Dict[Tuple[int, str], PatternFill]] = None,
+                border: Optional[Border] = THIN_BORDER,
+                widths: Optional[Sequence[int]] = None) -> int:
+    """
+    Escreve um DataFrame como tabela a partir da linha atual da aba
+    
+    Cabeçalho azul, bordas finas e larguras ajustadas, no mesmo padrão de
+    todas as abas do relatório. Serve também para tabelas grandes (ex.:
+    negócios brutos), já que as linhas são geradas uma a uma.
+    
+    Args:
+        ws: aba write-only ainda sem linhas
+        df: dados; os nomes das colunas viram o cabeçalho
+        number_formats: formato numérico por coluna
+        alignment: alinhamento das células de dados
+        fills: preenchimento de células específicas, por (linha do df, coluna)
+        border: borda de todas as células (None para nenhuma)
+        widths: larguras já conhecidas; padrão: calculadas a partir do df
+    
+    Returns:
+        Número de linhas escritas, contando o cabeçalho
+    """
+    number_formats = number_formats or {}
+    fills = fills or {}
+    
+    set_column_widths(ws, widths if widths is not None else frame_column_widths(df))
+    
+    ws.append([
+        styled_cell(ws, str(name), font=HEADER_FONT, fill=HEADER_FILL,
+                    border=border, alignment=HEADER_ALIGNMENT)
+        for name in df.columns
+    ])
+    
+    columns = list(df.columns)
+    styles = [
+        cell_style(ws, border=border, alignment=alignment, number_format=number_formats.get(name))
+        for name in columns
+    ]
+    
+    for row_idx, row in enumerate(df.itertuples(index=False, name=None)):
+        cells = [
+            styled_cell(ws, None if pd.isna(value) else value, style=style)
+            for value, style in zip(row, styles)
+        ]
+        if fills:
+            for col_idx, name in enumerate(columns):
+                if (row_idx, name) in fills:
+                    cells[col_idx].fill = fills[(row_idx, name)]
+        ws.append(cells)
+    
+    return len(df) + 1
 
 
 def create_kpi_sheet(wb, analytics: AgendorAnalytics):
@@ -97,31 +213,20 @@ def create_kpi_sheet(wb, analytics: AgendorAnalytics):
     
     df = pd.DataFrame(data)
     
-    # Escrever dados
-    for r_idx, row in enumerate(dataframe_to_rows(df, index=False, header=True), 1):
-        for c_idx, value in enumerate(row, 1):
-            cell = ws.cell(row=r_idx, column=c_idx, value=value)
-            if r_idx > 1:  # Não centralizar cabeçalho
-                cell.alignment = Alignment(horizontal="left", vertical="center")
-    
-    # Aplicar estilos
-    apply_header_style(ws, 2)
-    apply_borders(ws, len(df) + 1, 2)
-    auto_adjust_columns(ws, 2)
-    
     # Destacar valores importantes em verde/vermelho
-    green_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-    red_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+    fills = {}
     
     # Taxa de vitória (verde se > 50%)
     if win_loss.get('taxa_vitoria', 0) > 50:
-        ws['B5'].fill = green_fill
+        fills[(3, 'Valor')] = GREEN_FILL
     
     # Crescimento (verde se positivo)
     if growth.get('crescimento_percentual', 0) > 0:
-        ws['B11'].fill = green_fill
+        fills[(9, 'Valor')] = GREEN_FILL
     elif growth.get('crescimento_percentual', 0) < 0:
-        ws['B11'].fill = red_fill
+        fills[(9, 'Valor')] = RED_FILL
+    
+    write_table(ws, df, alignment=LEFT_ALIGNMENT, fills=fills)
 
 
 def create_sellers_sheet(wb, analytics: AgendorAnalytics):
@@ -131,38 +236,21 @@ def create_sellers_sheet(wb, analytics: AgendorAnalytics):
     sellers_df = analytics.calculate_seller_performance()
     
     if sellers_df.empty:
-        ws['A1'] = "Sem dados de vendedores"
+        ws.append(["Sem dados de vendedores"])
         return
     
-    # Criar DataFrame formatado para Excel
-    data = []
-    for _, seller in sellers_df.iterrows():
-        data.append({
-            'Vendedor': seller['vendedor'],
-            'Receita Total': seller['valor_total'],
-            'Negócios Ganhos': seller['ganhos'],
-            'Negócios Perdidos': seller['perdidos'],
-            'Taxa de Vitória (%)': seller['taxa_vitoria'],
-            'Ticket Médio': seller['ticket_medio'],
-            'Total Negócios': seller['total_negocios']
-        })
+    # Colunas renomeadas para o Excel
+    df = pd.DataFrame({
+        'Vendedor': sellers_df['vendedor'].to_numpy(),
+        'Receita Total': sellers_df['valor_total'].to_numpy(),
+        'Negócios Ganhos': sellers_df['ganhos'].to_numpy(),
+        'Negócios Perdidos': sellers_df['perdidos'].to_numpy(),
+        'Taxa de Vitória (%)': sellers_df['taxa_vitoria'].to_numpy(),
+        'Ticket Médio': sellers_df['ticket_medio'].to_numpy(),
+        'Total Negócios': sellers_df['total_negocios'].to_numpy()
+    })
     
-    df = pd.DataFrame(data)
-    
-    # Escrever dados
-    for r_idx, row in enumerate(dataframe_to_rows(df, index=False, header=True), 1):
-        for c_idx, value in enumerate(row, 1):
-            ws.cell(row=r_idx, column=c_idx, value=value)
-    
-    # Aplicar estilos
-    apply_header_style(ws, 7)
-    apply_borders(ws, len(df) + 1, 7)
-    auto_adjust_columns(ws, 7)
-    
-    # Formatar valores monetários
-    for row in range(2, len(df) + 2):
-        ws[f'B{row}'].number_format = 'R$ #,##0.00'
-        ws[f'F{row}'].number_format = 'R$ #,##0.00'
+    write_table(ws, df, number_formats={'Receita Total': MONEY_FORMAT, 'Ticket Médio': MONEY_FORMAT})
     
     # Criar gráfico de barras - Receita por Vendedor
     chart = BarChart()
@@ -189,35 +277,18 @@ def create_top_customers_sheet(wb, analytics: AgendorAnalytics):
     top_customers_df = analytics.calculate_top_customers(limit=20)
     
     if top_customers_df.empty:
-        ws['A1'] = "Sem dados de clientes"
+        ws.append(["Sem dados de clientes"])
         return
     
-    # Criar DataFrame formatado
-    data = []
-    for _, customer in top_customers_df.iterrows():
-        data.append({
-            'Cliente': customer['cliente'],
-            'Receita Total': customer['receita_total'],
-            'Quantidade de Negócios': customer['qtd_negocios'],
-            'Percentual': customer['percentual']
-        })
-    
-    df = pd.DataFrame(data)
-    
-    # Escrever dados
-    for r_idx, row in enumerate(dataframe_to_rows(df, index=False, header=True), 1):
-        for c_idx, value in enumerate(row, 1):
-            ws.cell(row=r_idx, column=c_idx, value=value)
+    # Colunas renomeadas para o Excel
+    df = pd.DataFrame({
+        'Cliente': top_customers_df['cliente'].to_numpy(),
+        'Receita Total': top_customers_df['receita_total'].to_numpy(),
+        'Quantidade de Negócios': top_customers_df['qtd_negocios'].to_numpy(),
+        'Percentual': top_customers_df['percentual'].to_numpy()
+    })
     
-    # Aplicar estilos
-    apply_header_style(ws, 4)
-    apply_borders(ws, len(df) + 1, 4)
-    auto_adjust_columns(ws, 4)
-    
-    # Formatar valores monetários e percentuais
-    for row in range(2, len(df) + 2):
-        ws[f'B{row}'].number_format = 'R$ #,##0.00'
-        ws[f'D{row}'].number_format = '0.00"%"'
+    write_table(ws, df, number_formats={'Receita Total': MONEY_FORMAT, 'Percentual': PERCENT_FORMAT})
     
     # Criar gráfico de pizza - Top 10
     pie = PieChart()
@@ -241,71 +312,78 @@ def create_funnel_sheet(wb, analytics: AgendorAnalytics):
     conversion_data = analytics.calculate_conversion_rates()
     
     if conversion_data.empty:
-        ws['A1'] = "Sem dados de funil"
+        ws.append(["Sem dados de funil"])
         return
     
-    # Agrupar por funil
-    for funnel_name in conversion_data['funil'].unique():
-        funnel_df = conversion_data[conversion_data['funil'] == funnel_name].sort_values('ordem')
-        
-        # Escrever nome do funil
-        current_row = ws.max_row + 2
-        ws[f'A{current_row}'] = f"Funil: {funnel_name}"
-        ws[f'A{current_row}'].font = Font(bold=True, size=12)
-        
-        # Cabeçalho
-        current_row += 1
-        headers = ['Etapa', 'Quantidade', 'Taxa de Conversão (%)']
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=current_row, column=col, value=header)
-            cell.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-            cell.font = Font(bold=True, color="FFFFFF")
-        
-        # Dados
-        for _, row in funnel_df.iterrows():
-            current_row += 1
-            ws[f'A{current_row}'] = row['etapa']
-            ws[f'B{current_row}'] = row['quantidade']
-            ws[f'C{current_row}'] = row['taxa_conversao']
-            ws[f'C{current_row}'].number_format = '0.00"%"'
+    headers = ['Etapa', 'Quantidade', 'Taxa de Conversão (%)']
     
-    auto_adjust_columns(ws, 3)
+    # Montar as linhas antes de escrever: as larguras saem delas
+    rows = [[]]
+    for funnel_name, funnel_df in conversion_data.groupby('funil', sort=False):
+        funnel_df = funnel_df.sort_values('ordem')
+        
+        # Linha em branco, nome do funil, cabeçalho e dados
+        rows.append([])
+        rows.append([f"Funil: {funnel_name}"])
+        rows.append(headers)
+        rows.extend(funnel_df[['etapa', 'quantidade', 'taxa_conversao']].itertuples(index=False, name=None))
+    
+    set_column_widths(ws, column_widths(rows, 3))
+    
+    for row in rows:
+        if not row:
+            ws.append([])
+        elif len(row) == 1:
+            ws.append([styled_cell(ws, row[0], font=SECTION_FONT)])
+        elif row is headers:
+            ws.append([styled_cell(ws, header, font=SECTION_HEADER_FONT, fill=HEADER_FILL) for header in row])
+        else:
+            etapa, quantidade, taxa = row
+            ws.append([etapa, quantidade, styled_cell(ws, taxa, number_format=PERCENT_FORMAT)])
 
 
-def generate_excel_report(analytics: AgendorAnalytics) -> BytesIO:
+def create_cover_sheet(wb, analytics: AgendorAnalytics):
+    """Cria aba de capa"""
+    ws = wb.create_sheet("📄 Capa")
+    
+    ws.append([styled_cell(ws, "RELATÓRIO GERENCIAL", font=TITLE_FONT)])
+    ws.append([])
+    ws.append([f"Data de Geração: {datetime.now().strftime('%d/%m/%Y %H:%M')}"])
+    ws.append([f"Total de Negócios: {len(analytics.df_deals)}"])
+    ws.append([])
+    ws.append(["Este relatório contém análises detalhadas de:"])
+    ws.append(["• KPIs Principais"])
+    ws.append(["• Performance por Vendedor"])
+    ws.append(["• Top Clientes"])
+    ws.append(["• Funil de Conversão"])
+
+
+def write_excel_report(analytics: AgendorAnalytics, target) -> None:
     """
-    Gera relatório Excel completo com múltiplas abas
+    Escreve o relatório Excel completo em um caminho ou arquivo aberto
     
-    Returns:
-        BytesIO com o arquivo Excel
+    Em modo write-only cada aba é escrita uma vez, na ordem final.
     """
-    wb = Workbook()
-    
-    # Remover aba padrão
-    if 'Sheet' in wb.sheetnames:
-        wb.remove(wb['Sheet'])
-    
-    # Criar aba de capa
-    ws_capa = wb.create_sheet("📄 Capa", 0)
-    ws_capa['A1'] = "RELATÓRIO GERENCIAL"
-    ws_capa['A1'].font = Font(bold=True, size=20)
-    ws_capa['A3'] = f"Data de Geração: {datetime.now().strftime('%d/%m/%Y %H:%M')}"
-    ws_capa['A4'] = f"Total de Negócios: {len(analytics.df_deals)}"
-    ws_capa['A6'] = "Este relatório contém análises detalhadas de:"
-    ws_capa['A7'] = "• KPIs Principais"
-    ws_capa['A8'] = "• Performance por Vendedor"
-    ws_capa['A9'] = "• Top Clientes"
-    ws_capa['A10'] = "• Funil de Conversão"
-    
-    # Criar abas
+    wb = Workbook(write_only=True)
+    
+    create_cover_sheet(wb, analytics)
     create_kpi_sheet(wb, analytics)
     create_sellers_sheet(wb, analytics)
     create_top_customers_sheet(wb, analytics)
     create_funnel_sheet(wb, analytics)
     
-    # Salvar em BytesIO
+    wb.save(target)
+
+
+def generate_excel_report(analytics: AgendorAnalytics) -> BytesIO:
+    """
+    Gera relatório Excel completo com múltiplas abas
+    
+    Returns:
+        BytesIO com o arquivo Excel
+    """
     buffer = BytesIO()
-    wb.save(buffer)
+    write_excel_report(analytics, buffer)
     buffer.seek(0)
     
     return buffer
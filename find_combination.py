@@ -1,27 +1,73 @@
-import itertools
-
-valores = [
-    ('Eixo Bluetec 1', 14930.18),
-    ('Eixo Sebratec', 14930.18),
-    ('Eixo Bluetec 2', 14930.18),
-    ('JC 120', 2994.77),
-    ('Apresentação 1', 0.00),
-    ('GA000-003', 5747.80),
-    ('Apresentação 2', 0.00),
-    ('Acoplamento', 11193.00),
-]
-
-target = 55983.54
-
-print(f"Buscando combinação que soma R$ {target:,.2f}...\n")
-
-for r in range(1, len(valores)+1):
-    for combo in itertools.combinations(valores, r):
-        total = sum(v for n, v in combo)
-        if abs(total - target) < 1:
-            print(f"✅ ENCONTRADO! {len(combo)} negócios:")
-            for nome, valor in combo:
-                print(f"   - {nome}: R$ {valor:,.2f}")
-            print(f"\n📊 Total: R$ {total:,.2f}")
-            print(f"📊 Ticket médio: R$ {total/len(combo):,.2f}")
-            break
+"""
+Descobre quais negócios ganhos no mês somam o total informado pelo Agendor
+
+Uso:
+    python find_combination.py 2025-10 55983.54
+    python find_combination.py 2025-10 55983.54 --tolerancia 0.5
+"""
+
+import argparse
+
+from agendor_client import AgendorClient
+from reconciliation import DEFAULT_MAX_SIZE, deals_won_in_month, reconcile
+
+
+def print_combinations(result, title):
+    print(f"\n{title}")
+
+    if result is None:
+        print("   (não calculado: soma grande demais, ver o outro lado)")
+        return
+
+    if result['tamanho'] is None:
+        if result['limite']:
+            print(f"   ⚠️ Nenhuma combinação encontrada até {result['limite']} negócios "
+                  "(maiores não testadas, ver --max-tamanho)")
+        else:
+            print("   ❌ Nenhuma combinação encontrada")
+        return
+
+    combinations = result['combinacoes']
+    print(f"   ✅ {len(combinations)} combinação(ões) com {result['tamanho']} negócios"
+          + (" (lista truncada)" if result['truncado'] else ""))
+
+    for number, combo in enumerate(combinations, 1):
+        total = sum(valor for _, valor in combo)
+        print(f"\n   #{number} - Total: R$ {total:,.2f}")
+        for nome, valor in combo:
+            print(f"      - {nome}: R$ {valor:,.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concilia o total de ganhos do mês com o do Agendor")
+    parser.add_argument("mes", help="mês no formato AAAA-MM")
+    parser.add_argument("alvo", type=float, help="total informado pelo Agendor (R$)")
+    parser.add_argument("--tolerancia", type=float, default=1.0, help="diferença aceita em R$ (padrão: 1.00)")
+    parser.add_argument("--max-resultados", type=int, default=20, help="combinações mostradas por lado")
+    parser.add_argument("--max-tamanho", type=int, default=DEFAULT_MAX_SIZE,
+                        help=f"maior combinação testada quando a soma passa do limite da busca exata "
+                             f"(padrão: {DEFAULT_MAX_SIZE})")
+    args = parser.parse_args()
+
+    client = AgendorClient()
+
+    print("Buscando negócios ganhos...")
+    deals = deals_won_in_month(client.get_deals_won(), args.mes)
+
+    items = [
+        (f"{deal.get('title') or 'Sem título'} (#{deal.get('id')})", float(deal.get('value') or 0))
+        for deal in deals
+    ]
+
+    result = reconcile(items, args.alvo, tolerance=args.tolerancia, max_results=args.max_resultados,
+                       max_size=args.max_tamanho)
+
+    print(f"\n📊 {len(items)} negócios ganhos em {args.mes}: R$ {result['total']:,.2f}")
+    print(f"🎯 Total do Agendor: R$ {args.alvo:,.2f} (diferença: R$ {result['diferenca']:,.2f})")
+
+    print_combinations(result['incluidos'], "Negócios que somam o total do Agendor:")
+    print_combinations(result['excluidos'], "Negócios que, retirados, fazem o total bater:")
+
+
+if __name__ == "__main__":
+    main()
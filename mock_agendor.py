@@ -0,0 +1,343 @@
+"""
+Dados sintéticos e servidor local imitando a API do Agendor
+Para medir cliente e análises sem depender da API real (e sem gastar o
+rate limit da conta)
+
+Uso:
+    python mock_agendor.py --deals 100000 --port 8765 --latency 0.05 --throttle-rate 0.02
+
+    AGENDOR_API_URL=http://127.0.0.1:8765/v3 AGENDOR_TOKEN=teste streamlit run dashboard.py
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from deal_sync import parse_api_datetime
+
+
+MAX_PER_PAGE = 100
+
+STATUS_NAMES = {1: 'Em andamento', 2: 'Ganho', 3: 'Perdido'}
+
+# Fuso dos horários gerados (a API devolve horário local com offset)
+API_TIMEZONE = timezone(timedelta(hours=-3))
+
+ORGANIZATION_PREFIXES = [
+    'Mineração', 'Construtora', 'Cimento', 'Indústria', 'Energia', 'Metalúrgica',
+    'Agro', 'Química', 'Transportes', 'Prefeitura de', 'Comercial', 'Distribuidora',
+    'Auto Peças', 'Loja', 'Oficina',
+]
+ORGANIZATION_SUFFIXES = ['Brasil', 'Sul', 'Norte', 'Minas', 'Paulista', 'Nordeste', 'Central', 'Vale']
+
+
+def format_api_datetime(value: datetime) -> str:
+    """Data no formato da API (ISO 8601 com milissegundos e offset)"""
+    return value.astimezone(API_TIMEZONE).isoformat(timespec='milliseconds')
+
+
+class SyntheticAgendor:
+    """
+    Conta fictícia do Agendor, gerada de forma determinística
+
+    Cada negócio depende só da semente e do seu índice, então qualquer
+    página sai na hora, sem montar a lista inteira (1M de negócios cabe).
+    Os updatedAt crescem com o índice, como numa conta real ordenada por
+    atualização, o que permite responder updatedDateGt com uma conta.
+
+    Args:
+        n_deals: quantidade de negócios
+        seed: semente; a mesma semente gera exatamente os mesmos dados
+        n_users: vendedores
+        n_organizations: clientes (padrão: ~1 para cada 5 negócios)
+        n_funnels: funis, com 5 etapas cada
+        start: data do negócio mais antigo (padrão: 2 anos atrás)
+        end: data da última atualização (padrão: agora)
+    """
+
+    def __init__(self, n_deals: int = 1000, seed: int = 0, n_users: int = 20,
+                 n_organizations: Optional[int] = None, n_funnels: int = 3,
+                 start: Optional[datetime] = None, end: Optional[datetime] = None):
+        self.n_deals = n_deals
+        self.seed = seed
+        self.first_id = 10_000_000
+        self.end = end or datetime.now(timezone.utc).replace(microsecond=0)
+        self.start = start or self.end - timedelta(days=730)
+        self._step = (self.end - self.start) / max(n_deals, 1)
+
+        rng = random.Random(seed)
+        self.users = [
+            {'id': 1000 + i, 'name': f'Vendedor {i + 1}', 'email': f'vendedor{i + 1}@exemplo.com.br'}
+            for i in range(n_users)
+        ]
+        self.funnels = [
+            {
+                'id': 100 + f,
+                'name': f'Funil {f + 1}',
+                'dealStages': [
+                    {'id': 1000 + f * 10 + s, 'name': f'Etapa {s + 1}', 'sequence': s + 1}
+                    for s in range(5)
+                ],
+            }
+            for f in range(n_funnels)
+        ]
+        n_organizations = n_organizations or max(1, n_deals // 5)
+        self.organizations = [
+            {
+                'id': 500_000 + i,
+                'name': f"{rng.choice(ORGANIZATION_PREFIXES)} {rng.choice(ORGANIZATION_SUFFIXES)} {i + 1}",
+            }
+            for i in range(n_organizations)
+        ]
+
+        # status de todos os negócios (1 byte cada) para filtrar por status
+        status_rng = np.random.default_rng(seed)
+        self._status = status_rng.choice(np.array([1, 2, 3], dtype=np.int8), size=n_deals, p=[0.3, 0.4, 0.3])
+        self._indexes_by_status: Dict[int, np.ndarray] = {}
+
+    def _rng(self, index: int) -> random.Random:
+        return random.Random(self.seed * 1_000_003 + index)
+
+    def updated_at(self, index: int) -> datetime:
+        return self.start + self._step * (index + 1)
+
+    def deal(self, index: int) -> Dict:
+        """Negócio de posição `index` no mesmo formato aninhado da API"""
+        rng = self._rng(index)
+        status = int(self._status[index])
+        updated = self.updated_at(index)
+        created = updated - timedelta(days=rng.randint(0, 120), hours=rng.randint(0, 23))
+        funnel = self.funnels[rng.randrange(len(self.funnels))]
+        stage = funnel['dealStages'][rng.randrange(len(funnel['dealStages']))]
+        owner = self.users[rng.randrange(len(self.users))] if rng.random() > 0.03 else None
+        organization = self.organizations[rng.randrange(len(self.organizations))] if rng.random() > 0.08 else None
+        closed = format_api_datetime(updated)
+
+        return {
+            'id': self.first_id + index,
+            'title': f'Proposta {index + 1}',
+            'value': round(rng.lognormvariate(9, 1), 2) if rng.random() > 0.05 else None,
+            'description': None,
+            'dealStatus': {'id': status, 'name': STATUS_NAMES[status]},
+            'dealStage': {
+                'id': stage['id'],
+                'name': stage['name'],
+                'sequence': stage['sequence'],
+                'funnel': {'id': funnel['id'], 'name': funnel['name']},
+            },
+            'owner': dict(owner) if owner else None,
+            'organization': dict(organization) if organization else None,
+            'person': None,
+            'createdAt': format_api_datetime(created),
+            'updatedAt': closed,
+            'startTime': format_api_datetime(created),
+            'endTime': closed if rng.random() > 0.3 else None,
+            'wonAt': closed if status == 2 else None,
+            'lostAt': closed if status == 3 else None,
+            'customFields': {},
+        }
+
+    def deal_by_id(self, deal_id: int) -> Optional[Dict]:
+        index = deal_id - self.first_id
+        return self.deal(index) if 0 <= index < self.n_deals else None
+
+    def deal_indexes(self, status: Optional[str] = None, updated_after: Optional[datetime] = None) -> np.ndarray:
+        """Posições dos negócios que atendem aos filtros da API, em ordem"""
+        if status:
+            status_id = {'ongoing': 1, 'won': 2, 'lost': 3}.get(status)
+            if status_id not in self._indexes_by_status:
+                self._indexes_by_status[status_id] = np.flatnonzero(self._status == status_id)
+            indexes = self._indexes_by_status[status_id]
+        else:
+            indexes = None
+
+        first = 0
+        if updated_after is not None:
+            # updatedAt(i) = start + step * (i + 1) > updated_after
+            elapsed = (updated_after - self.start) / self._step
+            first = min(self.n_deals, max(0, int(elapsed)))
+            while first < self.n_deals and self.updated_at(first) <= updated_after:
+                first += 1
+
+        if indexes is None:
+            return np.arange(first, self.n_deals)
+        return indexes[np.searchsorted(indexes, first):]
+
+    def deals_page(self, page: int, per_page: int = MAX_PER_PAGE, status: Optional[str] = None,
+                   updated_after: Optional[datetime] = None) -> List[Dict]:
+        indexes = self.deal_indexes(status, updated_after)
+        start = (page - 1) * per_page
+        return [self.deal(int(index)) for index in indexes[start:start + per_page]]
+
+    def all_deals(self) -> List[Dict]:
+        """Lista completa (para medir as análises sem passar pelo HTTP)"""
+        return [self.deal(index) for index in range(self.n_deals)]
+
+    def funnels_payload(self) -> List[Dict]:
+        return [dict(funnel) for funnel in self.funnels]
+
+
+class MockAgendorHandler(BaseHTTPRequestHandler):
+    """Rotas GET da API v3 usadas pelo AgendorClient"""
+
+    server: 'MockAgendorServer'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        server = self.server
+        server.count_request()
+
+        if server.latency:
+            time.sleep(server.latency * random.uniform(0.5, 1.5))
+
+        if server.throttle_rate and random.random() < server.throttle_rate:
+            server.count_throttled()
+            self._send(429, {'errors': ['Too Many Requests']}, {'Retry-After': str(server.retry_after)})
+            return
+
+        url = urlparse(self.path)
+        path = url.path.rstrip('/')
+        if path.startswith(server.prefix):
+            path = path[len(server.prefix):]
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        dataset = server.dataset
+
+        if path == '/deals':
+            page = max(1, int(params.get('page', 1)))
+            per_page = min(MAX_PER_PAGE, max(1, int(params.get('per_page', MAX_PER_PAGE))))
+            updated_after = parse_api_datetime(params.get('updatedDateGt'))
+            data = dataset.deals_page(page, per_page, params.get('status'), updated_after)
+            self._send(200, {'data': data})
+        elif path.startswith('/deals/'):
+            try:
+                deal = dataset.deal_by_id(int(path.rsplit('/', 1)[1]))
+            except ValueError:
+                deal = None
+            if deal is None:
+                self._send(404, {'errors': ['Not Found']})
+            else:
+                self._send(200, {'data': deal})
+        elif path == '/users':
+            self._send(200, {'data': dataset.users})
+        elif path == '/funnels':
+            self._send(200, {'data': dataset.funnels_payload()})
+        elif path == '/organizations':
+            page = max(1, int(params.get('page', 1)))
+            per_page = min(MAX_PER_PAGE, max(1, int(params.get('per_page', MAX_PER_PAGE))))
+            start = (page - 1) * per_page
+            self._send(200, {'data': dataset.organizations[start:start + per_page]})
+        elif path in ('/people', '/products', '/tasks'):
+            self._send(200, {'data': []})
+        else:
+            self._send(404, {'errors': ['Not Found']})
+
+    def _send(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MockAgendorServer(ThreadingHTTPServer):
+    """
+    Servidor HTTP local com os dados de um SyntheticAgendor
+
+    Args:
+        dataset: dados servidos
+        address: (host, porta); porta 0 escolhe uma livre
+        latency: atraso médio por requisição, em segundos (±50%)
+        throttle_rate: fração das requisições respondidas com 429
+        retry_after: valor do header Retry-After nos 429
+    """
+
+    daemon_threads = True
+
+    def __init__(self, dataset: SyntheticAgendor, address: Tuple[str, int] = ('127.0.0.1', 0),
+                 latency: float = 0.0, throttle_rate: float = 0.0, retry_after: float = 1,
+                 verbose: bool = False):
+        super().__init__(address, MockAgendorHandler)
+        self.dataset = dataset
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.verbose = verbose
+        self.prefix = '/v3'
+        self.requests = 0
+        self.throttled = 0
+        self._stats_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{self.prefix}"
+
+    def count_request(self):
+        with self._stats_lock:
+            self.requests += 1
+
+    def count_throttled(self):
+        with self._stats_lock:
+            self.throttled += 1
+
+
+def start_mock_server(dataset: SyntheticAgendor, **options) -> MockAgendorServer:
+    """
+    Sobe o servidor numa thread em segundo plano e devolve o servidor
+
+    Para apontar um cliente já criado: client.base_url = server.base_url.
+    Encerrar com server.shutdown().
+    """
+    server = MockAgendorServer(dataset, **options)
+    thread = threading.Thread(target=server.serve_forever, name="mock-agendor", daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local imitando a API do Agendor")
+    parser.add_argument("--deals", type=int, default=10000, help="quantidade de negócios")
+    parser.add_argument("--seed", type=int, default=0, help="semente dos dados")
+    parser.add_argument("--users", type=int, default=20, help="quantidade de vendedores")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="atraso médio por requisição (s)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fração de respostas 429")
+    parser.add_argument("--retry-after", type=float, default=1, help="Retry-After dos 429 (s)")
+    parser.add_argument("--verbose", action="store_true", help="loga cada requisição")
+    args = parser.parse_args()
+
+    dataset = SyntheticAgendor(args.deals, seed=args.seed, n_users=args.users)
+    server = MockAgendorServer(
+        dataset, (args.host, args.port), latency=args.latency,
+        throttle_rate=args.throttle_rate, retry_after=args.retry_after, verbose=args.verbose
+    )
+
+    print(f"🧪 API simulada do Agendor com {args.deals:,} negócios em {server.base_url}")
+    print(f"   AGENDOR_API_URL={server.base_url} AGENDOR_TOKEN=teste streamlit run dashboard.py")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\n{server.requests} requisições ({server.throttled} com 429)")
+
+
+if __name__ == "__main__":
+    main()
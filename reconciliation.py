@@ -0,0 +1,298 @@
+"""
+Conciliação de totais: quais negócios somam um valor informado pelo Agendor
+Usado no fechamento do mês quando o total do dashboard não bate com o do
+Agendor (ver find_combination.py)
+"""
+
+from bisect import bisect_left, bisect_right
+from math import gcd
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from deal_sync import parse_api_datetime
+
+
+# Maior soma (em centavos) resolvida pela programação dinâmica (1 byte por
+# centavo: R$ 500 mil = 50 MB); acima disso uma tabela menor, sobre valores
+# divididos por uma escala, dá o tamanho mínimo por baixo e a enumeração
+# começa nele
+DP_MAX_CENTS = 50_000_000
+LOWER_BOUND_CELLS = 5_000_000
+
+# Até quantos pares (i, j) a enumeração guarda as somas de dois itens para
+# achar os dois últimos de cada combinação por busca binária
+PAIR_TABLE_MAX = 5_000_000
+
+# Tamanho máximo de combinação testado sem a programação dinâmica
+DEFAULT_MAX_SIZE = 8
+
+# Teto de combinações devolvidas (valores repetidos multiplicam as respostas)
+DEFAULT_MAX_RESULTS = 100
+
+
+def to_cents(value) -> int:
+    """Valor em reais -> centavos inteiros (evita erro de ponto flutuante)"""
+    return int(round(float(value or 0) * 100))
+
+
+def deals_won_in_month(deals: List[Dict], month: str) -> List[Dict]:
+    """
+    Negócios ganhos no mês (AAAA-MM) pela data de ganho, no horário local
+    da API, como no filtro de ganhos do Agendor
+    """
+    year, month_number = (int(part) for part in month.split('-'))
+    selected = []
+    for deal in deals:
+        won_at = parse_api_datetime(deal.get('wonAt'))
+        if won_at is not None and (won_at.year, won_at.month) == (year, month_number):
+            selected.append(deal)
+    return selected
+
+
+# marca de soma inalcançável; +1 ainda cabe em uint8 (255), sem estouro
+UNREACHABLE = 254
+
+
+def _min_count_table(values: Sequence[int], limit: int) -> np.ndarray:
+    # dp[s] = menor número de itens (cada um usado no máximo uma vez) que
+    # soma exatamente s centavos; >= UNREACHABLE = inalcançável (ou 254+ itens)
+    dp = np.full(limit + 1, UNREACHABLE, dtype=np.uint8)
+    dp[0] = 0
+    buffer = np.empty_like(dp)
+    reach = 0
+
+    # do menor para o maior: a faixa já alcançável cresce devagar e cada
+    # item só atualiza até reach + valor
+    for value in sorted(values):
+        if value > limit:
+            break
+        top = min(reach + value, limit)
+        width = top + 1 - value
+        # o lado direito vai para o buffer antes da atribuição: cada item conta uma vez
+        candidate = np.add(dp[:width], 1, out=buffer[:width])
+        np.minimum(dp[value:top + 1], candidate, out=dp[value:top + 1])
+        reach = top
+    return dp
+
+
+def common_divisor_reduce(values: Sequence[int], low: int, high: int) -> Tuple[List[int], int, int]:
+    """
+    Divide valores e faixa pelo maior divisor comum dos valores
+
+    Somas de múltiplos de g só caem nos múltiplos de g da faixa, então o
+    resultado é o mesmo com uma tabela g vezes menor (ex.: valores em reais
+    inteiros cabem em 1/100 da memória).
+    """
+    divisor = gcd(*values) if values else 1
+    if divisor <= 1:
+        return list(values), low, high
+    return [value // divisor for value in values], -(-low // divisor), high // divisor
+
+
+def minimal_subset_size(values: Sequence[int], low: int, high: int) -> Optional[int]:
+    """
+    Menor quantidade de itens cuja soma fica em [low, high] (centavos)
+
+    Programação dinâmica sobre os centavos: O(itens × high) operações
+    vetorizadas. Retorna None se nenhuma combinação chega na faixa.
+    """
+    if high < 0 or low > high:
+        return None
+    dp = _min_count_table(values, high)
+    best = int(dp[max(low, 0):high + 1].min())
+    return None if best >= UNREACHABLE else best
+
+
+def minimal_size_lower_bound(values: Sequence[int], low: int, high: int) -> Optional[int]:
+    """
+    Limite inferior de minimal_subset_size para somas acima de DP_MAX_CENTS
+
+    A mesma tabela sobre os valores divididos (para baixo) por uma escala q
+    que a faz caber em LOWER_BOUND_CELLS: k itens perdem menos de k × q centavos
+    no arredondamento, então uma combinação de k itens na faixa tem soma
+    escalada em [(low - k × (q - 1)) / q, high / q]. O menor k com alguma
+    soma assim alcançável por até k itens não passa do tamanho real; None
+    garante que não há combinação.
+    """
+    if high < 0 or low > high:
+        return None
+    scale = -(-high // LOWER_BOUND_CELLS)
+    top = high // scale
+    dp = _min_count_table([value // scale for value in values], top)
+
+    for size in range(1, min(len(values), UNREACHABLE - 1) + 1):
+        first = max(-(-(low - size * (scale - 1)) // scale), 0)
+        if first <= top and dp[first:top + 1].min() <= size:
+            return size
+    return None
+
+
+def _enumerate_subsets(values: List[int], size: int, low: int, high: int,
+                       max_results: int) -> List[List[int]]:
+    """
+    Todas as combinações de exatamente `size` itens com soma em [low, high]
+
+    values precisa estar em ordem decrescente. Cada ramo é podado pelos
+    limites do que ainda cabe: com r itens a escolher a partir da posição i,
+    a soma extra fica entre os r menores (os últimos da lista) e os r
+    maiores a partir de i. O último item de cada combinação sai por busca
+    binária na faixa que falta, em vez de testar um a um; com até
+    PAIR_TABLE_MAX pares, os dois últimos saem juntos da tabela ordenada de
+    somas de pares.
+    """
+    n = len(values)
+    prefix = np.concatenate(([0], np.cumsum(values, dtype=np.int64))).tolist()
+    # valores negativos ficam em ordem crescente, como o bisect espera
+    negated = [-value for value in values]
+    results = []
+    chosen = []
+
+    pair_sums = None
+    if size >= 2 and n * (n - 1) // 2 <= PAIR_TABLE_MAX:
+        array = np.asarray(values, dtype=np.int64)
+        first_index, second_index = np.triu_indices(n, 1)
+        sums = array[first_index] + array[second_index]
+        order = np.argsort(sums, kind='stable')
+        pair_sums = sums[order].tolist()
+        pair_first = first_index[order].tolist()
+        pair_second = second_index[order].tolist()
+
+    def search(start: int, remaining: int, total: int):
+        if remaining == 1:
+            # índices j >= start com low - total <= values[j] <= high - total
+            first = bisect_left(negated, total - high, start)
+            last = bisect_right(negated, total - low, start)
+            for j in range(first, last):
+                results.append(chosen + [j])
+                if len(results) >= max_results:
+                    return
+            return
+
+        if remaining == 2 and pair_sums is not None:
+            # pares (i, j) com soma na faixa que falta; só valem os que começam em start ou depois
+            first = bisect_left(pair_sums, low - total)
+            last = bisect_right(pair_sums, high - total)
+            for k in range(first, last):
+                if pair_first[k] >= start:
+                    results.append(chosen + [pair_first[k], pair_second[k]])
+                    if len(results) >= max_results:
+                        return
+            return
+
+        for i in range(start, n - remaining + 1):
+            # maiores possíveis a partir de i: values[i:i+remaining]
+            if total + prefix[i + remaining] - prefix[i] < low:
+                return  # daqui em diante os valores só diminuem
+            # menores possíveis: os `remaining` últimos
+            if total + values[i] + prefix[n] - prefix[n - remaining + 1] > high:
+                continue
+            chosen.append(i)
+            search(i + 1, remaining - 1, total + values[i])
+            chosen.pop()
+            if len(results) >= max_results:
+                return
+
+    if size == 0:
+        return [[]] if low <= 0 <= high else []
+    search(0, size, 0)
+    return results
+
+
+def find_minimal_subsets(items: Sequence[Tuple[str, float]], target: float, tolerance: float = 1.0,
+                         max_results: int = DEFAULT_MAX_RESULTS,
+                         max_size: int = DEFAULT_MAX_SIZE) -> Dict:
+    """
+    Combinações com o menor número de itens cuja soma bate com o alvo
+
+    Args:
+        items: pares (rótulo, valor em reais)
+        target: soma procurada, em reais
+        tolerance: diferença aceita, em reais (somas em target ± tolerance)
+        max_results: teto de combinações devolvidas
+        max_size: maior combinação testada quando a soma é grande demais
+                  para a programação dinâmica exata (ver DP_MAX_CENTS)
+
+    Returns:
+        {'tamanho': menor quantidade de itens (None se não houver),
+         'combinacoes': lista de combinações [(rótulo, valor), ...],
+         'truncado': True se havia mais combinações que max_results,
+         'limite': maior tamanho testado quando a busca acima de
+                   DP_MAX_CENTS parou nele sem achar nada (combinações maiores não foram
+                   testadas); None quando a resposta é definitiva}
+
+    Itens sem valor (0) não mudam a soma e ficam de fora; valores negativos
+    não são suportados.
+    """
+    low = to_cents(target) - to_cents(tolerance)
+    high = to_cents(target) + to_cents(tolerance)
+
+    # ordem decrescente para a poda da enumeração
+    candidates = sorted(
+        ((to_cents(value), label, value) for label, value in items if to_cents(value) > 0),
+        key=lambda item: -item[0]
+    )
+    values = [cents for cents, _, _ in candidates]
+
+    if high < 0:
+        return {'tamanho': None, 'combinacoes': [], 'truncado': False, 'limite': None}
+    if low <= 0:
+        return {'tamanho': 0, 'combinacoes': [[]], 'truncado': False, 'limite': None}
+
+    limit = None
+    reduced = common_divisor_reduce(values, low, high)
+    if reduced[2] <= DP_MAX_CENTS:
+        size = minimal_subset_size(*reduced)
+        sizes = [] if size is None else [size]
+    else:
+        # o limite inferior costuma ser o tamanho exato; acima dele a busca
+        # segue até max_size (ou só o próprio limite, se já passar disso)
+        first = minimal_size_lower_bound(*reduced)
+        if first is None:
+            sizes = []
+        else:
+            last = min(max(first, max_size), len(values))
+            sizes = range(first, last + 1)
+            if last < len(values):
+                limit = last
+
+    for size in sizes:
+        found = _enumerate_subsets(values, size, low, high, max_results + 1)
+        if found:
+            combinations = [
+                [(candidates[i][1], candidates[i][2]) for i in subset]
+                for subset in found[:max_results]
+            ]
+            return {'tamanho': size, 'combinacoes': combinations, 'truncado': len(found) > max_results,
+                    'limite': None}
+
+    return {'tamanho': None, 'combinacoes': [], 'truncado': False, 'limite': limit}
+
+
+def reconcile(items: Sequence[Tuple[str, float]], target: float, tolerance: float = 1.0,
+              max_results: int = DEFAULT_MAX_RESULTS, max_size: int = DEFAULT_MAX_SIZE) -> Dict:
+    """
+    Explica um total divergente pelos dois lados
+
+    'incluidos': menores conjuntos de itens que somam o alvo;
+    'excluidos': menores conjuntos que, retirados, deixam o restante igual
+    ao alvo (soma = total - alvo). Quando o alvo está perto do total, este
+    é o lado útil (e o rápido): poucos negócios explicam a diferença.
+    """
+    total = sum(float(value or 0) for _, value in items)
+    result = {
+        'total': total,
+        'diferenca': total - target,
+        'incluidos': None,
+        'excluidos': None,
+    }
+
+    # cada lado só é resolvido quando cabe na programação dinâmica ou é
+    # o menor dos dois (o outro seria uma busca longa sem ganho)
+    include_target, exclude_target = target, total - target
+    if include_target <= exclude_target or to_cents(include_target) <= DP_MAX_CENTS:
+        result['incluidos'] = find_minimal_subsets(items, include_target, tolerance, max_results, max_size)
+    if exclude_target < include_target or to_cents(exclude_target) <= DP_MAX_CENTS:
+        result['excluidos'] = find_minimal_subsets(items, exclude_target, tolerance, max_results, max_size)
+
+    return result
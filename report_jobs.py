@@ -0,0 +1,55 @@
+"""
+Geração de relatórios em segundo plano
+Os relatórios rodam em um pool de threads e ficam guardados por chave,
+para que o dashboard consulte o andamento sem bloquear a página
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Hashable, Optional
+
+from config import REPORT_CACHE_SIZE
+
+
+class ReportJobs:
+    """
+    Fila de relatórios compartilhada pelo processo
+
+    Cada relatório é identificado por uma chave (ex.: versão dos dados +
+    assinatura dos filtros). Pedir de novo uma chave em andamento ou já
+    pronta devolve o mesmo job; os prontos ficam guardados até max_entries,
+    saindo primeiro os usados há mais tempo. Jobs com erro são refeitos no
+    próximo pedido.
+    """
+
+    def __init__(self, max_workers: int = 2, max_entries: int = REPORT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report")
+        self._jobs: "OrderedDict[Hashable, Future]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, key: Hashable, build: Callable[[], bytes]) -> Future:
+        """Agenda build() para a chave, a menos que já exista um job válido"""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or (job.done() and job.exception() is not None):
+                job = self._executor.submit(build)
+                self._jobs[key] = job
+            self._jobs.move_to_end(key)
+            self._evict()
+            return job
+
+    def get(self, key: Hashable) -> Optional[Future]:
+        """Job da chave, se houver"""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                self._jobs.move_to_end(key)
+            return job
+
+    def _evict(self):
+        # só descarta jobs terminados; os em andamento não contam como cache
+        finished = [key for key, job in self._jobs.items() if job.done()]
+        for key in finished[:max(0, len(self._jobs) - self.max_entries)]:
+            del self._jobs[key]
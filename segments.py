@@ -0,0 +1,114 @@
+"""
+Classificação de clientes em segmentos por palavras-chave no nome
+Usada pelas análises (calculate_top_segments) e pelo debug_segments.py
+"""
+
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Regras em ordem de prioridade: vale o primeiro segmento com alguma
+# palavra-chave contida no nome (em minúsculas)
+SEGMENT_RULES: List[Tuple[str, List[str]]] = [
+    ('Mineração', ['miner', 'mineração', 'mineracao', 'minera']),
+    ('Construção/Engenharia', ['constru', 'obras', 'engenharia']),
+    ('Cimento/Concreto', ['cimento', 'concreto']),
+    ('Indústria', ['industria', 'indústria', 'fabrica', 'fábrica']),
+    ('Energia', ['energia', 'eletric', 'hidrel']),
+    ('Metalurgia/Siderurgia', ['metal', 'siderur', 'aço', 'aco']),
+    ('Agronegócio', ['agricola', 'agrícola', 'agro']),
+    ('Química', ['quimic', 'química']),
+    ('Transporte/Logística', ['transport', 'logistic']),
+    ('Setor Público', ['prefeitura', 'governo', 'municipal']),
+]
+
+DEFAULT_SEGMENT = 'Outros'
+
+
+class SegmentClassifier:
+    """
+    Classificador compilado a partir de uma tabela de regras
+
+    Todas as palavras-chave viram uma única regex, em ordem de prioridade,
+    dentro de um lookahead: uma só passada pelo nome encontra as
+    palavras-chave em cada posição, inclusive sobrepostas (ex.: "aco"
+    dentro de "concreto"), e vale a regra de menor índice, como no if/elif.
+    Os resultados ficam em cache por nome.
+    """
+
+    def __init__(self, rules: Sequence[Tuple[str, Iterable[str]]] = SEGMENT_RULES,
+                 default: str = DEFAULT_SEGMENT):
+        self.segments = [segment for segment, _ in rules] + [default]
+        self.default = default
+        self._priority: Dict[str, int] = {}
+        for index, (_, words) in enumerate(rules):
+            for word in words:
+                self._priority.setdefault(word, index)
+        keywords = '|'.join(re.escape(word) for word in self._priority)
+        self.pattern = re.compile(f"(?=({keywords}))")
+        self._cache: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _match(self, name: str) -> str:
+        priority = self._priority
+        found = self.pattern.findall(name.lower())
+        # sem palavra-chave: índice -1, o segmento padrão
+        return self.segments[min((priority[word] for word in found), default=-1)]
+
+    def classify(self, name: Optional[str]) -> str:
+        """Segmento de um nome de cliente"""
+        return self.classify_names([name])[0]
+
+    def classify_names(self, names: Sequence) -> List[str]:
+        """Segmentos de uma lista de nomes, calculando só os ainda fora do cache"""
+        keys = ['' if name is None or name is pd.NA or (isinstance(name, float) and np.isnan(name))
+                else str(name) for name in names]
+
+        missing = [key for key in dict.fromkeys(keys) if key not in self._cache]
+        if missing:
+            labels = [self._match(key) for key in missing]
+            with self._lock:
+                self._cache.update(zip(missing, labels))
+
+        cache = self._cache
+        return [cache[key] for key in keys]
+
+    def classify_series(self, names: pd.Series) -> pd.Series:
+        """
+        Segmento de cada linha, como categoria
+
+        Classifica só os nomes distintos (as categorias, quando a coluna é
+        categórica) e espalha o resultado pelos códigos.
+        """
+        if isinstance(names.dtype, pd.CategoricalDtype):
+            codes = names.cat.codes.to_numpy()
+            uniques = list(names.cat.categories)
+        else:
+            codes, uniques = pd.factorize(names, use_na_sentinel=True)
+            uniques = list(uniques)
+
+        # código -1 (nome vazio) fica na última posição
+        labels = np.array(self.classify_names(uniques + ['']), dtype=object)
+        categories = sorted(set(self.segments))
+        return pd.Series(
+            pd.Categorical(labels[codes], categories=categories),
+            index=names.index,
+            name='segmento'
+        )
+
+
+DEFAULT_CLASSIFIER = SegmentClassifier()
+
+
+def identify_segment(name: Optional[str]) -> str:
+    """Segmento de um nome de cliente pelas regras padrão (SEGMENT_RULES)"""
+    return DEFAULT_CLASSIFIER.classify(name)
+
+
+def classify_segments(names: pd.Series) -> pd.Series:
+    """Segmento de cada nome de uma coluna pelas regras padrão"""
+    return DEFAULT_CLASSIFIER.classify_series(names)
@@ -0,0 +1,195 @@
+"""
+Conjunto de dados compartilhado por todas as sessões do dashboard
+Uma única cópia dos negócios (lista bruta e DataFrame) por processo,
+atualizada em segundo plano e trocada de forma atômica
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from config import LOCAL_STORE_MAX_AGE
+from agendor_client import AgendorClient, AgendorAPIError
+from analytics import build_deals_dataframe
+from async_agendor_client import load_dashboard_data
+
+
+# Espera (s) antes de tentar de novo depois de uma atualização com falha;
+# dobra a cada falha seguida, até o refresh_interval
+RETRY_AFTER_FAILURE = 30
+
+
+class DealDataset:
+    """
+    Foto imutável dos dados do Agendor usada pelas sessões
+
+    Nada aqui deve ser alterado depois de publicado: as sessões leem os
+    mesmos objetos sem cópia. Filtros devem gerar frames novos. A exceção
+    é loaded_at, renovado quando uma atualização não traz mudanças.
+    snapshot_version é a versão do DealSnapshot que originou os dados.
+    """
+
+    def __init__(self, deals: List[Dict], users: List[Dict], funnels: List[Dict],
+                 df_deals: pd.DataFrame, version: int, loaded_at: Optional[float] = None,
+                 snapshot_version: Optional[int] = None):
+        self.deals = deals
+        self.users = users
+        self.funnels = funnels
+        self.df_deals = df_deals
+        self.version = version
+        self.loaded_at = loaded_at or time.time()
+        self.snapshot_version = snapshot_version
+
+    def age(self) -> float:
+        """Segundos desde a carga"""
+        return time.time() - self.loaded_at
+
+
+class SharedDataset:
+    """
+    Guarda o DealDataset atual do processo
+
+    Uma thread em segundo plano (start) sincroniza com a API a cada
+    refresh_interval segundos; as sessões sempre recebem o dataset atual na
+    hora, mesmo vencido, e um dataset vencido só agenda uma atualização.
+    A carga acontece fora das sessões e a publicação é a troca de uma
+    referência: quem já pegou o dataset anterior continua com ele até o
+    próximo rerun. Só a primeira carga do processo, sem nada no
+    armazenamento local, espera pela API.
+    """
+
+    def __init__(self, client: AgendorClient, refresh_interval: float = LOCAL_STORE_MAX_AGE):
+        self.client = client
+        self.refresh_interval = refresh_interval
+        self.last_error: Optional[Exception] = None
+        self._current: Optional[DealDataset] = None
+        self._version = 0
+        self._refresh_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._full_requested = False
+        # backoff depois de falhas: sem ele, cada rerun com dados vencidos
+        # acordaria o worker para mais um ciclo contra a API fora do ar
+        self._failures = 0
+        self._retry_at = 0.0
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+
+    @property
+    def current(self) -> Optional[DealDataset]:
+        return self._current
+
+    def get(self) -> Optional[DealDataset]:
+        """
+        Retorna o dataset atual sem esperar pela API
+
+        Se estiver vencido, pede uma atualização ao worker (respeitando o
+        backoff depois de falhas) e devolve o atual.
+        Sem dataset ainda, carrega do armazenamento local ou, em último caso,
+        da API (só a primeira sessão do processo espera; as demais aguardam
+        essa mesma carga). Levanta AgendorAPIError se essa carga falhar.
+        """
+        dataset = self._current
+        if dataset is None:
+            with self._refresh_lock:
+                if self._current is None:
+                    self._current = self._load_from_store() or self._load()
+            dataset = self._current
+
+        if (dataset is not None and dataset.age() >= self.refresh_interval
+                and time.time() >= self._retry_at):
+            self.request_refresh()
+        return dataset
+
+    def start(self) -> None:
+        """Inicia o worker de atualização (uma vez por processo)"""
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="agendor-refresher", daemon=True
+                )
+                self._worker.start()
+
+    def request_refresh(self, full: bool = False) -> None:
+        """
+        Pede uma atualização imediata ao worker, sem esperar por ela
+
+        full=True baixa todos os negócios de novo (remove os excluídos no
+        Agendor) em vez de só os alterados.
+        """
+        if full:
+            self._full_requested = True
+        self.start()
+        self._wake.set()
+
+    def refresh(self, full: bool = False) -> Optional[DealDataset]:
+        """Recarrega da API agora (bloqueante) e retorna o dataset atual"""
+        with self._refresh_lock:
+            return self._load(full)
+
+    def _run(self):
+        while True:
+            self._wake.wait(timeout=self.refresh_interval)
+            self._wake.clear()
+            # depois de uma falha, respeita o backoff mesmo se acordado antes
+            delay = self._retry_at - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            full, self._full_requested = self._full_requested, False
+            try:
+                self.refresh(full)
+                self.last_error = None
+                self._failures = 0
+                self._retry_at = 0.0
+            except Exception as e:
+                # mantém o dataset anterior e tenta de novo depois do backoff
+                print(f"Erro ao atualizar dados do Agendor: {e}")
+                self.last_error = e
+                self._failures += 1
+                self._retry_at = time.time() + min(
+                    self.refresh_interval, RETRY_AFTER_FAILURE * 2 ** (self._failures - 1)
+                )
+
+    def _load_from_store(self) -> Optional[DealDataset]:
+        # dados já gravados em disco por outro processo ou execução anterior
+        store = self.client.store
+        if store is None:
+            return None
+
+        self.client.load_snapshot()
+        deals = self.client.deal_snapshot.deals
+        state = store.get_sync_state('deals')
+        if not deals or state is None:
+            return None
+
+        return self._publish(deals, store.load('users'), store.load('funnels'),
+                             loaded_at=state['synced_at'])
+
+    def _load(self, full: bool = False) -> Optional[DealDataset]:
+        # falhas (inclusive o teste de conexão: token revogado, API fora do
+        # ar) sobem como AgendorAPIError para quem pediu a carga; o dataset
+        # anterior continua publicado
+        deals, users, funnels = load_dashboard_data(self.client, full=full)
+        if deals is None:
+            raise AgendorAPIError("sem conexão com a API do Agendor")
+
+        current = self._current
+        if (current is not None
+                and current.snapshot_version == self.client.deal_snapshot.version
+                and current.users == (users or []) and current.funnels == (funnels or [])):
+            # nada mudou: mantém o dataset e a versão (chave dos caches de
+            # análises e relatórios); só renova o horário da carga
+            current.loaded_at = time.time()
+            return current
+        return self._publish(deals, users, funnels)
+
+    def _publish(self, deals, users, funnels, loaded_at: Optional[float] = None) -> DealDataset:
+        self._version += 1
+        dataset = DealDataset(
+            deals, users or [], funnels or [],
+            build_deals_dataframe([deals]), self._version, loaded_at,
+            snapshot_version=self.client.deal_snapshot.version
+        )
+        self._current = dataset
+        return dataset
@@ -11,7 +11,8 @@ def test_connection():
     print("🔍 TESTE DE CONEXÃO - AGENDOR API")
     print("=" * 50)
     
-    client = AgendorClient()
+    # sem armazenamento local: o teste precisa ir até a API
+    client = AgendorClient(use_store=False)
     
     print("\n1. Testando conexão...")
     if client.test_connection():